@@ -1,27 +1,194 @@
+import asyncio
 import hashlib
-from fastapi import FastAPI, Response, Query, Request
-from generators import stats_card, lang_card, contrib_card, recent_activity_card
-from utils import github_api
+import json
+import os
+from fastapi import FastAPI, HTTPException, Response, Query, Request
+from fastapi.responses import StreamingResponse
+from generators import recent_activity_card
+from utils import github_api, github_async, token_pool
+from utils import cache, raster, render_pool, svg_optimize
+from utils.compression import CompressedVariants
+from utils.profile_cache import FRESH, ProfileCache, make_entry
+from utils.prewarm import PopularityTracker, Prewarmer
+from utils.render_cache import RenderCache, max_bytes_setting
+from utils.singleflight import SingleFlight
 from typing import Optional
 
 app = FastAPI()
 
+# Concurrent requests for the same user/token/fields share one upstream fetch.
+_profile_flight = SingleFlight()
+
+
+async def _fetch_live_profile(username, token, fields):
+    key = (username, token_pool.token_scope(token), fields)
+    return await _profile_flight.do(
+        key, lambda: github_async.get_live_github_data_async(username, token, fields)
+    )
+
+
+# Profile data is served from here with stale-while-revalidate / stale-if-error.
+# CACHE_BACKEND=sqlite|redis shares both caches between workers.
+_profile_cache = ProfileCache(cache.get_backend("profile"), _fetch_live_profile)
+
+# Rendered cards, keyed by request parameters and the profile data version.
+_render_cache = RenderCache(
+    cache.get_backend("render", max_entries=float("inf"), max_bytes=max_bytes_setting())
+)
+
+
+def profile_key(username, token=None, fields=None):
+    fields = github_api.ALL_FIELDS if fields is None else frozenset(fields)
+    return ProfileCache.key(username, token_pool.token_scope(token), fields)
+
+
+async def fetch_profile_entry(username, token=None, fields=None):
+    """
+    Returns the cached profile entry ({"data", "version", "fetched_at"}),
+    refreshing it in the background once stale. Misses go through the
+    single-flight layer, so concurrent requests for the same fields trigger
+    one fetch. A fresh full profile (as the prewarmer keeps) serves any
+    fields. Falls back to mock data like the handlers always have.
+    """
+    fields = github_api.ALL_FIELDS if fields is None else frozenset(fields)
+    if fields != github_api.ALL_FIELDS:
+        full, state = await _profile_cache.lookup(profile_key(username, token, github_api.ALL_FIELDS))
+        if state == FRESH:
+            return full
+    entry, _ = await _profile_cache.get(profile_key(username, token, fields), username, token, fields)
+    return entry or make_entry(github_api.get_mock_data(username))
+
+
+async def fetch_profile(username, token=None, fields=None):
+    return (await fetch_profile_entry(username, token, fields))["data"]
+
+
+def card_etag(render_key):
+    """Strong ETag for a card, derived from its render key (request parameters + data version)."""
+    return '"' + hashlib.sha256(render_key.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match; also accept unquoted tags.
+    return any(tag.removeprefix("W/").strip('"') == etag.strip('"') for tag in candidates)
+
+
+# Card types served by the multi-card endpoints.
+CARD_RENDERERS = render_pool.CARD_DRAWERS
+
+# Contribution grid markup: "paths" (one <path> per level) or "rects" (one <rect> per day).
+CONTRIB_GRID = os.getenv("CONTRIB_GRID", "paths")
+
+
+def card_fields(endpoints):
+    """Fetch field groups needed by the given cards, so e.g. a streak card skips the repo walk."""
+    return github_api.fields_for(key for endpoint in endpoints for key in render_pool.CARD_FIELDS[endpoint])
+
+
+def card_spec(endpoint, username, theme, custom_colors, options):
+    return {"endpoint": endpoint, "username": username, "theme": theme, "colors": custom_colors, "options": options}
+
+
+def render_key(spec, version):
+    # Optimized and raw cards (and different precisions) get separate keys and ETags.
+    return RenderCache.key(
+        spec["endpoint"], spec["username"], spec["theme"], spec["colors"], spec["options"], version,
+        output=svg_optimize.setting_tag(),
+    )
+
+
+async def cached_render(spec, entry):
+    """Returns (svg, etag) for a card spec drawn from a profile entry, via the render cache."""
+    key = render_key(spec, entry["version"])
+    svg_content = await _render_cache.get(key)
+    if svg_content is None:
+        svg_content = await render_pool.render(
+            spec["endpoint"], entry["data"], spec["theme"], spec["colors"], spec["options"]
+        )
+        await _render_cache.set(key, svg_content)
+        await asyncio.to_thread(_compressed.prepare, card_etag(key), svg_content)
+    return svg_content, card_etag(key)
+
+
+# gzip/brotli bodies per ETag, built once when a card is rendered.
+_compressed = CompressedVariants()
+
+
+# Request popularity drives background refreshes of the most embedded cards.
+_popularity = PopularityTracker()
+_prewarmer = Prewarmer(_popularity, _profile_cache, profile_key, cached_render)
+
+
+async def render_card(request, endpoint, username, theme, custom_colors, options):
+    """
+    Responds with the card SVG. The ETag is known before anything is drawn,
+    so a matching If-None-Match gets a 304 without rendering -- and, while
+    the profile data is cached, without contacting GitHub either. Otherwise
+    the SVG comes from the render cache, drawn on a miss.
+    """
+    spec = card_spec(endpoint, username, theme, custom_colors, options)
+    _popularity.record(render_key(spec, ""), spec)
+
+    entry = await fetch_profile_entry(username, fields=card_fields([endpoint]))
+    etag = card_etag(render_key(spec, entry["version"]))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    svg_content, etag = await cached_render(spec, entry)
+    return await svg_response(svg_content, request, etag=etag)
+
+
+@app.on_event("startup")
+async def start_prewarmer():
+    _prewarmer.start()
+
+
+@app.on_event("shutdown")
+async def close_github_client():
+    await _prewarmer.stop()
+    await github_async.aclose_async_client()
+    raster.shutdown()
+    render_pool.shutdown()
+
 # Implements HTTP conditional requests for CDN-safe SVG caching
 
-def svg_response(svg_content: str, request: Request):
-    etag = hashlib.md5(svg_content.encode("utf-8")).hexdigest()
+CACHE_HEADERS = {
+    "Cache-Control": "public, max-age=14400, s-maxage=14400",
+    "Vary": "Accept-Encoding"
+}
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers={**CACHE_HEADERS, "ETag": etag})
+
 
-    if request.headers.get("if-none-match") == etag:
-        return Response(status_code=304)
+async def svg_response(svg_content: str, request: Request, etag: Optional[str] = None,
+                       media_type: str = "image/svg+xml"):
+    if etag is None:
+        etag = '"' + hashlib.md5(svg_content.encode("utf-8")).hexdigest() + '"'
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    accept_encoding = request.headers.get("accept-encoding")
+    ready = _compressed.get_ready(etag, svg_content, accept_encoding)
+    if ready is None:
+        # First response for this ETag: compress off the event loop.
+        ready = await asyncio.to_thread(_compressed.get, etag, svg_content, accept_encoding)
+    encoding, body = ready
+    headers = {**CACHE_HEADERS, "ETag": etag}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
 
     return Response(
-        content=svg_content,
-        media_type="image/svg+xml",
-        headers={
-            "Cache-Control": "public, max-age=14400, s-maxage=14400",
-            "ETag": etag,
-            "Vary": "Accept-Encoding"
-        }
+        content=body,
+        media_type=media_type,
+        headers=headers
     )
 
 
@@ -30,6 +197,29 @@ def svg_response(svg_content: str, request: Request):
 def read_root():
     return {"message": "GitCanvas API is running"}
 
+
+@app.get("/api/cache-stats")
+def cache_stats():
+    return {
+        "render": _render_cache.stats(),
+        "prewarm": {
+            "tracked": len(_popularity),
+            "refreshed": _prewarmer.refreshed,
+            "skipped_for_budget": _prewarmer.skipped_for_budget,
+            "requests_this_window": {
+                resource: _prewarmer.budget.spent(resource) for resource in ("core", "graphql")
+            },
+        },
+        "optimize": render_pool.optimize_stats.stats(),
+    }
+
+def parse_exclude(exclude):
+    """Parses the comma separated exclude parameter into a list of languages."""
+    if not exclude:
+        return []
+    return [lang.strip() for lang in exclude.split(',') if lang.strip()]
+
+
 def parse_colors(bg_color, title_color, text_color, border_color):
     """Helper to construct custom color dict only if values are provided."""
     colors = {}
@@ -53,8 +243,6 @@ async def get_stats(
     text_color: Optional[str] = None,
     border_color: Optional[str] = None
 ):
-    data = github_api.get_live_github_data(username) or github_api.get_mock_data(username)
-    
     show_options = {
         "stars": not hide_stars,
         "commits": not hide_commits,
@@ -63,8 +251,9 @@ async def get_stats(
     }
     
     custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
-    svg_content = stats_card.draw_stats_card(data, theme, show_options=show_options, custom_colors=custom_colors)
-    return svg_response(svg_content , request)
+    return await render_card(
+        request, "stats", username, theme, custom_colors, show_options
+    )
 
 
 @app.get("/api/languages")
@@ -78,16 +267,13 @@ async def get_languages(
     text_color: Optional[str] = None,
     border_color: Optional[str] = None
 ):
-    data = github_api.get_live_github_data(username) or github_api.get_mock_data(username)
     custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
     
-    # Parse exclude parameter into list of languages
-    excluded_languages = []
-    if exclude:
-        excluded_languages = [lang.strip() for lang in exclude.split(',') if lang.strip()]
+    excluded_languages = parse_exclude(exclude)
     
-    svg_content = lang_card.draw_lang_card(data, theme, custom_colors=custom_colors, excluded_languages=excluded_languages)
-    return svg_response(svg_content , request)
+    return await render_card(
+        request, "languages", username, theme, custom_colors, {"exclude": excluded_languages}
+    )
 
 
 @app.get("/api/contributions")
@@ -100,10 +286,26 @@ async def get_contributions(
     text_color: Optional[str] = None,
     border_color: Optional[str] = None
 ):
-    data = github_api.get_live_github_data(username) or github_api.get_mock_data(username)
     custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
-    svg_content = contrib_card.draw_contrib_card(data, theme, custom_colors=custom_colors)
-    return svg_response(svg_content , request)
+    return await render_card(
+        request, "contributions", username, theme, custom_colors, {"grid": CONTRIB_GRID}
+    )
+
+
+@app.get("/api/streak")
+async def get_streak(
+    request: Request,
+    username: str,
+    theme: str = "Default",
+    bg_color: Optional[str] = None,
+    title_color: Optional[str] = None,
+    text_color: Optional[str] = None,
+    border_color: Optional[str] = None
+):
+    custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
+    return await render_card(
+        request, "streak", username, theme, custom_colors, None
+    )
 
 
 @app.get("/api/recent")
@@ -117,11 +319,199 @@ async def get_recent(
     text_color: Optional[str] = None,
     border_color: Optional[str] = None
 ):
-    # Note: recent_activity_card fetches its own data internally via GitHub API
-    # It just needs the username. github_api.get_live_github_data is not strictly needed 
-    # unless we want to use shared logic or mock data fallback, 
-    # but recent_activity_card.draw_recent_activity_card takes `{'username': ...}`.
+    # Events are fetched on the async client and handed to the card, so the
+    # card's own blocking fetch never runs on the event loop.
+    events, events_error = await github_async.fetch_recent_events(username, token)
     
     custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
-    svg_content = recent_activity_card.draw_recent_activity_card({'username': username}, theme, custom_colors=custom_colors, token=token)
-    return svg_response(svg_content, request)
+    card_data = {'username': username, 'events': events, 'events_error': events_error}
+    svg_content = recent_activity_card.draw_recent_activity_card(card_data, theme, custom_colors=custom_colors, token=token)
+    if svg_optimize.enabled():
+        drawn_size = len(svg_content.encode("utf-8"))
+        svg_content = svg_optimize.optimize(svg_content)
+        render_pool.optimize_stats.record("recent", drawn_size, len(svg_content.encode("utf-8")))
+    return await svg_response(svg_content, request)
+
+
+def card_options(hide_stars, hide_commits, hide_repos, hide_followers, exclude):
+    """Per-card options for endpoints that render several card types."""
+    return {
+        "stats": {
+            "stars": not hide_stars,
+            "commits": not hide_commits,
+            "repos": not hide_repos,
+            "followers": not hide_followers
+        },
+        "languages": {"exclude": parse_exclude(exclude)},
+        "contributions": {"grid": CONTRIB_GRID},
+    }
+
+
+def multipart_bundle(cards, etags, boundary):
+    parts = []
+    for name, svg_content in cards.items():
+        parts.append(
+            f"--{boundary}\r\n"
+            f"Content-Type: image/svg+xml\r\n"
+            f'Content-Disposition: inline; name="{name}"; filename="{name}.svg"\r\n'
+            f"ETag: {etags[name]}\r\n\r\n"
+            f"{svg_content}\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n")
+    return "".join(parts), f"multipart/mixed; boundary={boundary}"
+
+
+@app.get("/api/bundle")
+async def get_bundle(
+    request: Request,
+    username: str,
+    cards: str = "stats,languages,contributions,streak",
+    theme: str = "Default",
+    format: str = "json",
+    hide_stars: bool = False,
+    hide_commits: bool = False,
+    hide_repos: bool = False,
+    hide_followers: bool = False,
+    exclude: Optional[str] = None,
+    bg_color: Optional[str] = None,
+    title_color: Optional[str] = None,
+    text_color: Optional[str] = None,
+    border_color: Optional[str] = None
+):
+    """
+    Renders several cards of one user from a single profile fetch. Returns a
+    JSON map of card name -> SVG, or multipart/mixed with format=multipart.
+    Each card is the same SVG, from the same caches, as its own endpoint.
+    """
+    names = list(dict.fromkeys(name.strip() for name in cards.split(",") if name.strip()))
+    unknown = [name for name in names if name not in CARD_RENDERERS]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown cards: {', '.join(unknown) or '(none)'}; choose from {', '.join(CARD_RENDERERS)}",
+        )
+    if format not in ("json", "multipart"):
+        raise HTTPException(status_code=400, detail="format must be json or multipart")
+
+    custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
+    options = card_options(hide_stars, hide_commits, hide_repos, hide_followers, exclude)
+    specs = [card_spec(name, username, theme, custom_colors, options.get(name)) for name in names]
+    for spec in specs:
+        _popularity.record(render_key(spec, ""), spec)
+
+    entry = await fetch_profile_entry(username, fields=card_fields(names))
+    etags = {spec["endpoint"]: card_etag(render_key(spec, entry["version"])) for spec in specs}
+    etag = card_etag(format + "".join(etags.values()))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    results = await asyncio.gather(*(cached_render(spec, entry) for spec in specs))
+    rendered = {spec["endpoint"]: svg_content for spec, (svg_content, _) in zip(specs, results)}
+    if format == "multipart":
+        # The boundary comes from the ETag so equal bundles are byte-identical.
+        body, media_type = multipart_bundle(rendered, etags, f"bundle-{etag.strip(chr(34))}")
+    else:
+        body, media_type = json.dumps({"username": username, "cards": rendered}), "application/json"
+    return await svg_response(body, request, etag=etag, media_type=media_type)
+
+
+@app.get("/api/leaderboard")
+async def get_leaderboard(
+    usernames: str,
+    card: str = "stats",
+    theme: str = "Default",
+    hide_stars: bool = False,
+    hide_commits: bool = False,
+    hide_repos: bool = False,
+    hide_followers: bool = False,
+    exclude: Optional[str] = None,
+    bg_color: Optional[str] = None,
+    title_color: Optional[str] = None,
+    text_color: Optional[str] = None,
+    border_color: Optional[str] = None
+):
+    """
+    Renders one card type for many users (comma separated `usernames`) and
+    streams NDJSON lines of {"username", "card", "etag", "svg"} in completion
+    order, so one slow profile doesn't hold back the rest. Profiles go through
+    the same caches, single-flight and rate-limit admission as the single-user
+    endpoints, at most LEADERBOARD_CONCURRENCY (default 8) at a time.
+    """
+    names = list(dict.fromkeys(name.strip() for name in usernames.split(",") if name.strip()))
+    max_users = int(os.getenv("LEADERBOARD_MAX_USERS", "200"))
+    if not names or len(names) > max_users:
+        raise HTTPException(status_code=400, detail=f"Pass between 1 and {max_users} usernames")
+    if card not in CARD_RENDERERS:
+        raise HTTPException(status_code=400, detail=f"Unknown card {card}; choose from {', '.join(CARD_RENDERERS)}")
+
+    custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
+    options = card_options(hide_stars, hide_commits, hide_repos, hide_followers, exclude).get(card)
+    semaphore = asyncio.Semaphore(int(os.getenv("LEADERBOARD_CONCURRENCY", "8")))
+    fields = card_fields([card])
+
+    async def render_one(username):
+        async with semaphore:
+            spec = card_spec(card, username, theme, custom_colors, options)
+            try:
+                entry = await fetch_profile_entry(username, fields=fields)
+                svg_content, etag = await cached_render(spec, entry)
+            except Exception as e:
+                print(f"Leaderboard Error for {username}: {e}")
+                return {"username": username, "card": card, "error": str(e)}
+            return {"username": username, "card": card, "etag": etag, "svg": svg_content}
+
+    async def stream():
+        tasks = [asyncio.ensure_future(render_one(username)) for username in names]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            # Stop outstanding work when the client goes away.
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.get("/api/{card}.png")
+async def get_card_png(
+    request: Request,
+    card: str,
+    username: str,
+    theme: str = "Default",
+    scale: float = 1.0,
+    hide_stars: bool = False,
+    hide_commits: bool = False,
+    hide_repos: bool = False,
+    hide_followers: bool = False,
+    exclude: Optional[str] = None,
+    bg_color: Optional[str] = None,
+    title_color: Optional[str] = None,
+    text_color: Optional[str] = None,
+    border_color: Optional[str] = None
+):
+    """
+    PNG version of a card for clients that can't show SVG. Rasterization
+    runs in a process pool and is cached by SVG hash and scale (0.25-4).
+    """
+    if card not in CARD_RENDERERS:
+        raise HTTPException(status_code=404, detail=f"Unknown card {card}; choose from {', '.join(CARD_RENDERERS)}")
+    scale = raster.clamp_scale(scale)
+    custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
+    options = card_options(hide_stars, hide_commits, hide_repos, hide_followers, exclude).get(card)
+    spec = card_spec(card, username, theme, custom_colors, options)
+    _popularity.record(render_key(spec, ""), spec)
+
+    entry = await fetch_profile_entry(username, fields=card_fields([card]))
+    etag = card_etag(f"{render_key(spec, entry['version'])}:png:{scale:g}")
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    svg_content, _ = await cached_render(spec, entry)
+    try:
+        png = await raster.rasterize(svg_content, scale)
+    except raster.RasterUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except raster.RasterBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return Response(content=png, media_type="image/png", headers={**CACHE_HEADERS, "ETag": etag})
@@ -1,7 +1,7 @@
 ﻿import math
-import svgwrite
+from .svg_writer import Drawing
 import random
-from themes.styles import THEMES
+from themes.styles import THEMES, theme_classes
 from datetime import date, datetime, timedelta
 
 
@@ -137,7 +137,31 @@ def _weeks_to_cells(weeks, cols, rows, max_date):
     return cells
 
 
-def _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, box_size, gap, theme):
+def _add_level_paths(dwg, positions, levels, colors, box_size, radius, **extra):
+    """
+    Draws the grid as one <path> per intensity level instead of one <rect>
+    per day. Each day is the square inset by `radius`, stroked with width
+    2 * radius and round joins in the fill color, which covers exactly the
+    box_size square with corners of that radius -- the same as
+    rect(rx=radius). Squares are chained with relative moves.
+    """
+    inner = box_size - 2 * radius
+    squares = {}
+    for (x, y), level in zip(positions, levels):
+        if level is not None:
+            squares.setdefault(level, []).append((x + radius, y + radius))
+
+    for level in sorted(squares):
+        d = []
+        px, py = 0, 0  # a leading relative moveto is absolute
+        for x, y in squares[level]:
+            d.append(f"m{x - px} {y - py}h{inner}v{inner}h{-inner}z")
+            px, py = x, y
+        dwg.add(dwg.path(d="".join(d), fill=colors[level], stroke=colors[level],
+                         stroke_width=2 * radius, stroke_linejoin="round", **extra))
+
+
+def _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, box_size, gap, label_class):
     last_month = None
     max_label_x = start_x + (cols - 1) * (box_size + gap)
 
@@ -159,32 +183,20 @@ def _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, box_size, gap
             if x > max_label_x - 10:
                 x = max_label_x - 10
             y = start_y - 10
-            dwg.add(dwg.text(
-                month_label,
-                insert=(x, y),
-                fill=theme["text_color"],
-                font_size=9,
-                font_family=theme["font_family"],
-                opacity=0.8
-            ))
+            dwg.add(dwg.text(month_label, insert=(x, y), class_=label_class))
             last_month = month_label
 
     label_x = start_x - 24
     label_rows = {1: "Mon", 3: "Wed", 5: "Fri"}
     for row, label in label_rows.items():
         y = start_y + row * (box_size + gap) + box_size - 1
-        dwg.add(dwg.text(
-            label,
-            insert=(label_x, y),
-            fill=theme["text_color"],
-            font_size=9,
-            font_family=theme["font_family"],
-            opacity=0.8
-        ))
-def draw_contrib_card(data, theme_name="Default", custom_colors=None):
+        dwg.add(dwg.text(label, insert=(label_x, y), class_=label_class))
+def draw_contrib_card(data, theme_name="Default", custom_colors=None, grid="rects"):
     """
     Generates the Contribution Graph Card SVG.
     Supports 'Snake', 'Space', 'Marvel' visualization logic.
+    grid: "rects" draws one <rect> per day; "paths" draws the Default, Gaming
+    and Stranger_things grids as one <path> per level, which looks the same.
     """
     # Save original theme name for comparison (fix from main branch)
     original_theme_name = theme_name
@@ -200,19 +212,16 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
     if original_theme_name == "Gaming":
         width = 560
         height = 180
-    dwg = svgwrite.Drawing(size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
+    dwg = Drawing(size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
+    css, classes = theme_classes(theme, "bg", "title", "label")
+    dwg.defs.add(dwg.style(css))
     
     # Background
-    dwg.add(dwg.rect(insert=(0, 0), size=("100%", "100%"), rx=10, ry=10, 
-                     fill=theme["bg_color"], stroke=theme["border_color"], stroke_width=2))
+    dwg.add(dwg.rect(insert=(0, 0), size=("100%", "100%"), rx=10, ry=10, class_=classes["bg"]))
     
     # Title
     title = f"{data['username']}'s Contributions"
-    dwg.add(dwg.text(title, insert=(20, 24), 
-                     fill=theme["title_color"], 
-                     font_size=theme.get("title_font_size", 18), 
-                     font_family=theme.get("font_family", "Arial"), 
-                     font_weight="bold"))
+    dwg.add(dwg.text(title, insert=(20, 24), class_=classes["title"]))
     
     # Theme Specific Logic
     contributions = data.get("contributions", [])
@@ -235,7 +244,7 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
         levels = _levels_from_cells(cells, max_count)
         positions = _grid_positions(cols, rows, start_x, start_y, grid_size, gap)
 
-        _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, grid_size, gap, theme)
+        _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, grid_size, gap, classes["label"])
         
         # Draw a simple grid path (Snake body) taking up space
         dwg.add(dwg.text(f"SCORE: {data.get('total_commits', '0')}", insert=(width-120, 30),
@@ -245,18 +254,25 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
         colors = [theme["bg_color"], "#0e4429", "#006d32", "#26a641", "#39d353"]
         last_active_index = None
 
-        for idx, (x, y) in enumerate(positions):
-            level = levels[idx]
-            if level is None:
-                continue
-            fill = colors[level]
-            dwg.add(dwg.rect(insert=(x, y), size=(grid_size, grid_size), fill=fill, rx=2, ry=2))
-            if level > 0:
-                last_active_index = idx
+        if grid == "paths":
+            # Apples sit on their own cells, so drawing them after the grid looks the same
+            _add_level_paths(dwg, positions, levels, colors, grid_size, 2)
+            apples = [level if level == 4 else None for level in levels]
+            _add_level_paths(dwg, positions, apples, {4: "#FF3333"}, grid_size, 2)
+            last_active_index = max((idx for idx, level in enumerate(levels) if level), default=None)
+        else:
+            for idx, (x, y) in enumerate(positions):
+                level = levels[idx]
+                if level is None:
+                    continue
+                fill = colors[level]
+                dwg.add(dwg.rect(insert=(x, y), size=(grid_size, grid_size), fill=fill, rx=2, ry=2))
+                if level > 0:
+                    last_active_index = idx
 
-            # Apples represent peak contribution days
-            if level == 4:
-                dwg.add(dwg.rect(insert=(x, y), size=(grid_size, grid_size), fill="#FF3333", rx=2, ry=2))
+                # Apples represent peak contribution days
+                if level == 4:
+                    dwg.add(dwg.rect(insert=(x, y), size=(grid_size, grid_size), fill="#FF3333", rx=2, ry=2))
 
         # Snake head at last active cell
         if last_active_index is not None:
@@ -289,7 +305,7 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
         gap = 2
         positions = _grid_positions(cols, rows, start_x, start_y, grid_size, gap)
 
-        _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, grid_size, gap, theme)
+        _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, grid_size, gap, classes["label"])
 
         for idx, (sx, sy) in enumerate(positions):
             level = levels[idx]
@@ -384,22 +400,30 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
         levels = _levels_from_cells(cells, max_count)
         positions = _grid_positions(cols, rows, start_x, start_y, box_size, gap)
 
-        _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, box_size, gap, theme)
+        _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, box_size, gap, classes["label"])
         
         # Red-tinted colors for Stranger Things theme
         colors = ["#1a1a1a", "#8b0000", "#b22222", "#dc143c", "#ff0000"]
         
-        for idx, (x, y) in enumerate(positions):
-            level = levels[idx]
-            if level is None:
-                continue
-            fill = colors[level]
-            
-            dwg.add(dwg.rect(insert=(x, y), size=(box_size, box_size), fill=fill, rx=1, opacity=0.7))
-            
-            if level == 4:  # High activity - add glow
-                dwg.add(dwg.rect(insert=(x-1, y-1), size=(box_size+2, box_size+2), 
-                               fill="none", stroke="#ff0000", stroke_width=0.5, opacity=0.4))
+        if grid == "paths":
+            # The glow outlines stay clear of neighbouring cells, so they can follow the grid
+            _add_level_paths(dwg, positions, levels, colors, box_size, 1, opacity=0.7)
+            for idx, (x, y) in enumerate(positions):
+                if levels[idx] == 4:
+                    dwg.add(dwg.rect(insert=(x-1, y-1), size=(box_size+2, box_size+2), 
+                                   fill="none", stroke="#ff0000", stroke_width=0.5, opacity=0.4))
+        else:
+            for idx, (x, y) in enumerate(positions):
+                level = levels[idx]
+                if level is None:
+                    continue
+                fill = colors[level]
+                
+                dwg.add(dwg.rect(insert=(x, y), size=(box_size, box_size), fill=fill, rx=1, opacity=0.7))
+                
+                if level == 4:  # High activity - add glow
+                    dwg.add(dwg.rect(insert=(x-1, y-1), size=(box_size+2, box_size+2), 
+                                   fill="none", stroke="#ff0000", stroke_width=0.5, opacity=0.4))
         
         # Mini demogorgon silhouette
         demo_x = width - 50
@@ -627,16 +651,19 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
         levels = _levels_from_cells(cells, max_count)
         positions = _grid_positions(cols, rows, start_x, start_y, box_size, gap)
 
-        _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, box_size, gap, theme)
+        _add_timeline_labels(dwg, weeks, cols, rows, start_x, start_y, box_size, gap, classes["label"])
 
         colors = ["#161b22", "#0e4429", "#006d32", "#26a641", "#39d353"]
 
-        for idx, (x, y) in enumerate(positions):
-            level = levels[idx]
-            if level is None:
-                continue
-            fill = colors[level]
-            dwg.add(dwg.rect(insert=(x, y), size=(box_size, box_size), fill=fill, rx=2, ry=2))
+        if grid == "paths":
+            _add_level_paths(dwg, positions, levels, colors, box_size, 2)
+        else:
+            for idx, (x, y) in enumerate(positions):
+                level = levels[idx]
+                if level is None:
+                    continue
+                fill = colors[level]
+                dwg.add(dwg.rect(insert=(x, y), size=(box_size, box_size), fill=fill, rx=2, ry=2))
                 
     return dwg.tostring()
 
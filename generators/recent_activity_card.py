@@ -1,6 +1,6 @@
-import svgwrite
-import requests
-from themes.styles import THEMES
+from .svg_writer import Drawing
+from themes.styles import THEMES, theme_classes
+from utils import http_client
 
 
 def draw_recent_activity_card(data, theme_name="Default", custom_colors=None, token=None):
@@ -9,7 +9,8 @@ def draw_recent_activity_card(data, theme_name="Default", custom_colors=None, to
     showing the last 3 Pull Request or Issue events.
 
     Params:
-      data: dict with at least 'username'
+      data: dict with at least 'username'; may carry prefetched 'events'
+            (or 'events_error') so callers with their own fetch layer skip the request
       theme_name: string key from THEMES OR a theme dictionary (if already resolved)
       custom_colors: dict to override theme values (only used if theme_name is a string)
       token: optional GitHub token string for higher rate limit
@@ -32,21 +33,26 @@ def draw_recent_activity_card(data, theme_name="Default", custom_colors=None, to
         if custom_colors:
             theme.update(custom_colors)
 
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    if token:
-        headers["Authorization"] = f"token {token}"
+    if data.get('events_error'):
+        return _render_svg_lines([data['events_error']], theme)
 
-    url = f"https://api.github.com/users/{username}/events"
-    try:
-        resp = requests.get(url, headers=headers, timeout=8)
-    except Exception as e:
-        # Return an SVG with the error
-        return _render_svg_lines([f"Error fetching events: {e}"], theme)
+    events = data.get('events')
+    if events is None:
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if token:
+            headers["Authorization"] = f"token {token}"
 
-    if resp.status_code != 200:
-        return _render_svg_lines([f"GitHub API error: {resp.status_code}"], theme)
+        url = f"https://api.github.com/users/{username}/events"
+        try:
+            resp = http_client.conditional_get(url, headers=headers, timeout=8)
+        except Exception as e:
+            # Return an SVG with the error
+            return _render_svg_lines([f"Error fetching events: {e}"], theme)
 
-    events = resp.json()
+        if resp.status_code != 200:
+            return _render_svg_lines([f"GitHub API error: {resp.status_code}"], theme)
+
+        events = resp.json()
 
     lines = []
     for ev in events:
@@ -96,22 +102,20 @@ def draw_recent_activity_card(data, theme_name="Default", custom_colors=None, to
 def _render_svg_lines(lines, theme):
     width = 520
     height = 120
-    dwg = svgwrite.Drawing(size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
+    dwg = Drawing(size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
+
+    css, classes = theme_classes(theme, "bg", "title", "text")
+    dwg.defs.add(dwg.style(css))
 
-    dwg.add(dwg.rect(insert=(0, 0), size=(width, height), rx=8, ry=8,
-                     fill=theme["bg_color"], stroke=theme["border_color"], stroke_width=2))
+    dwg.add(dwg.rect(insert=(0, 0), size=(width, height), rx=8, ry=8, class_=classes["bg"]))
 
     title = "Recent Activity"
-    dwg.add(dwg.text(title, insert=(20, 30),
-                     fill=theme["title_color"], font_size=theme.get("title_font_size", 18),
-                     font_family=theme.get("font_family", "sans-serif"), font_weight="bold"))
+    dwg.add(dwg.text(title, insert=(20, 30), class_=classes["title"]))
 
     y = 55
     for i, line in enumerate(lines):
         # simple truncation to avoid overflow
         text = line if len(line) <= 80 else line[:77] + '...'
-        dwg.add(dwg.text(text, insert=(20, y + i * 20),
-                         fill=theme["text_color"], font_size=theme.get("text_font_size", 14),
-                         font_family=theme.get("font_family", "sans-serif")))
+        dwg.add(dwg.text(text, insert=(20, y + i * 20), class_=classes["text"]))
 
     return dwg.tostring()
\ No newline at end of file
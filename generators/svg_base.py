@@ -1,24 +1,24 @@
-import svgwrite
-from themes.styles import THEMES
+from .svg_writer import Drawing
+from themes.styles import THEMES, theme_classes
 
-def create_svg_base(theme_name, custom_colors, width, height, title_text):
+def create_svg_base(theme_name, custom_colors, width, height, title_text, roles=()):
     """
     Creates the base SVG drawing with theme setup, background, and title.
-    Returns the drawing object and the theme dictionary.
+    Returns the drawing object, the theme dictionary and the theme class
+    names for `roles` (plus "bg" and "title").
     """
     theme = THEMES.get(theme_name, THEMES["Default"]).copy()
     if custom_colors:
         theme.update(custom_colors)
     
-    dwg = svgwrite.Drawing(size=(f"{width}px", f"{height}px"))
+    dwg = Drawing(size=(f"{width}px", f"{height}px"))
+    css, classes = theme_classes(theme, "bg", "title", *roles)
+    dwg.defs.add(dwg.style(css))
     
     # Background
-    dwg.add(dwg.rect(insert=(0, 0), size=("100%", "100%"), rx=10, ry=10, 
-                     fill=theme["bg_color"], stroke=theme["border_color"], stroke_width=2))
+    dwg.add(dwg.rect(insert=(0, 0), size=("100%", "100%"), rx=10, ry=10, class_=classes["bg"]))
     
     # Title
-    dwg.add(dwg.text(title_text, insert=(20, 30), 
-                     fill=theme["title_color"], font_size=theme["title_font_size"], 
-                     font_family=theme["font_family"], font_weight="bold"))
+    dwg.add(dwg.text(title_text, insert=(20, 30), class_=classes["title"]))
     
-    return dwg, theme
+    return dwg, theme, classes
@@ -0,0 +1,60 @@
+"""
+Precompiled SVG card templates.
+
+A card whose layout only depends on theme, colors and options is drawn once
+with slot markers in place of the per-user values (``slot("username")``),
+and the resulting SVG is split into literal parts around the slots. Filling
+the template is then a join of the literal parts with the escaped values.
+
+Values are escaped for where their slot sits: attribute values get attribute
+escaping, text content gets text escaping -- the same rules svg_writer uses,
+so a filled template is byte-identical to drawing the card directly. The one
+exception is an empty value: the writer leaves out empty attributes and text
+nodes, while a template keeps the attribute or element with nothing in it.
+"""
+
+from .svg_writer import _escape_attribute, _escape_text
+
+_MARK = "\x00"
+
+
+def slot(name):
+    """Placeholder for the value `name`; usable anywhere a string is drawn."""
+    return f"{_MARK}{name}{_MARK}"
+
+
+def _inside_tag(literal, inside):
+    # The slot sits inside a tag when the last '<' comes after the last '>'.
+    opened, closed = literal.rfind("<"), literal.rfind(">")
+    if opened == closed:  # neither present
+        return inside
+    return opened > closed
+
+
+class SvgTemplate:
+    __slots__ = ("parts", "slots")
+
+    def __init__(self, svg):
+        pieces = svg.split(_MARK)
+        self.parts = pieces[0::2]
+        self.slots = []
+        inside = False
+        for literal, name in zip(pieces[0::2], pieces[1::2]):
+            inside = _inside_tag(literal, inside)
+            self.slots.append((name, _escape_attribute if inside else _escape_text))
+
+    def fill(self, values):
+        """values: slot name -> value (str()'d, then escaped)."""
+        parts = self.parts
+        out = [parts[0]]
+        for (name, escape), literal in zip(self.slots, parts[1:]):
+            out.append(escape(str(values[name])))
+            out.append(literal)
+        return "".join(out)
+
+
+def freeze(mapping):
+    """Hashable form of an options or colors dict, for template cache keys."""
+    if not mapping:
+        return None
+    return tuple(sorted(mapping.items()))
@@ -0,0 +1,297 @@
+"""
+Lightweight streaming SVG writer for the card generators.
+
+Implements the subset of the svgwrite API the cards use -- Drawing, rect,
+text, circle, line, path, defs, style, filter primitives and linear/radial
+gradients -- without validation and without keeping a DOM: each element is
+serialized into the drawing's string buffer as soon as it is added.
+
+Output is byte-identical to svgwrite's ``tostring()``: attributes sorted by
+name, the same keyword -> attribute mapping (``stroke_width`` ->
+``stroke-width``, ``class_`` -> ``class``), ``str()`` number formatting,
+ElementTree escaping and self-closing empty elements.
+"""
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+EV_NS = "http://www.w3.org/2001/xml-events"
+
+_ATTRIBUTE_NAMES = {}
+
+
+def _attribute_name(key):
+    name = _ATTRIBUTE_NAMES.get(key)
+    if name is None:
+        name = _ATTRIBUTE_NAMES[key] = key.rstrip("_").replace("_", "-")
+    return name
+
+
+def _escape_text(value):
+    if "&" in value:
+        value = value.replace("&", "&amp;")
+    if "<" in value:
+        value = value.replace("<", "&lt;")
+    if ">" in value:
+        value = value.replace(">", "&gt;")
+    return value
+
+
+def _escape_attribute(value):
+    value = _escape_text(value)
+    if '"' in value:
+        value = value.replace('"', "&quot;")
+    if "\r" in value:
+        value = value.replace("\r", "&#13;")
+    if "\n" in value:
+        value = value.replace("\n", "&#10;")
+    if "\t" in value:
+        value = value.replace("\t", "&#09;")
+    return value
+
+
+def _to_string(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value if item is not None)
+    return str(value)
+
+
+class Element:
+    __slots__ = ("name", "attribs", "children", "text")
+
+    def __init__(self, name, extra=None, text=None):
+        self.name = name
+        self.attribs = {}
+        self.children = []
+        self.text = text
+        if extra:
+            self.update(extra)
+
+    def update(self, attribs):
+        for key, value in attribs.items():
+            self.attribs[_attribute_name(key)] = value
+
+    def __setitem__(self, key, value):
+        self.attribs[key] = value
+
+    def __getitem__(self, key):
+        return self.attribs[key]
+
+    def add(self, element):
+        self.children.append(element)
+        return element
+
+    def open_tag(self):
+        """Returns '<name attr="..." ...' without the closing bracket."""
+        parts = ["<", self.name]
+        for name, value in sorted(self.attribs.items()):
+            if value is None:
+                continue
+            value = _to_string(value)
+            if value:
+                parts.append(f' {name}="{_escape_attribute(value)}"')
+        return "".join(parts)
+
+    def write(self, out):
+        """Appends this element and its children to the list of strings `out`."""
+        if not self.text and not self.children:
+            out.append(self.open_tag() + " />")
+            return
+        out.append(self.open_tag() + ">")
+        if self.text:
+            out.append(_escape_text(self.text))
+        for child in self.children:
+            child.write(out)
+        out.append(f"</{self.name}>")
+
+    def tostring(self):
+        out = []
+        self.write(out)
+        return "".join(out)
+
+
+class Style(Element):
+    __slots__ = ()
+
+    def __init__(self, content="", **extra):
+        super().__init__("style", extra, text=content)
+        self["type"] = "text/css"
+
+    def write(self, out):
+        if self.text:
+            out.append(f"{self.open_tag()}><![CDATA[{self.text}]]></style>")
+        else:
+            out.append(self.open_tag() + " />")
+
+
+class Gradient(Element):
+    __slots__ = ()
+
+    def add_stop_color(self, offset=None, color=None, opacity=None):
+        stop = Element("stop")
+        if offset is not None:
+            stop["offset"] = offset
+        if color is not None:
+            stop["stop-color"] = color
+        if opacity is not None:
+            stop["stop-opacity"] = opacity
+        self.add(stop)
+        return self
+
+
+def _region(element, start, size):
+    if start is not None:
+        element["x"], element["y"] = start[0], start[1]
+    if size is not None:
+        element["width"], element["height"] = size[0], size[1]
+
+
+def _primitive(name, requires_input):
+    def build(self, start=None, size=None, **extra):
+        # Like svgwrite, primitives that need an input default to in="SourceGraphic".
+        in_ = extra.pop("in_", "SourceGraphic") if requires_input else None
+        element = Element(name, extra)
+        _region(element, start, size)
+        if requires_input:
+            element["in"] = in_
+        return self.add(element)
+
+    build.__name__ = name
+    return build
+
+
+class Filter(Element):
+    __slots__ = ()
+
+    feBlend = _primitive("feBlend", True)
+    feColorMatrix = _primitive("feColorMatrix", True)
+    feComposite = _primitive("feComposite", True)
+    feGaussianBlur = _primitive("feGaussianBlur", True)
+    feMorphology = _primitive("feMorphology", True)
+    feOffset = _primitive("feOffset", True)
+    feFlood = _primitive("feFlood", False)
+    feTurbulence = _primitive("feTurbulence", False)
+
+    def feMerge(self, layernames, start=None, size=None, **extra):
+        merge = Element("feMerge", extra)
+        _region(merge, start, size)
+        for layername in layernames:
+            merge.add(Element("feMergeNode", {"in_": layername}))
+        return self.add(merge)
+
+
+class Defs:
+    """The drawing's <defs>; definitions are serialized as they are added."""
+
+    def __init__(self):
+        self._parts = []
+
+    def add(self, element):
+        element.write(self._parts)
+        return element
+
+
+class Drawing:
+    def __init__(self, filename="noname.svg", size=("100%", "100%"), **extra):
+        self.filename = filename
+        self.attribs = {}
+        self.update(extra)
+        if size is not None:
+            self.attribs["width"], self.attribs["height"] = size[0], size[1]
+        self.defs = Defs()
+        self._parts = []
+
+    def update(self, attribs):
+        for key, value in attribs.items():
+            self.attribs[_attribute_name(key)] = value
+
+    def add(self, element):
+        element.write(self._parts)
+        return element
+
+    # Element factories, mirroring svgwrite.Drawing's.
+
+    def rect(self, insert=(0, 0), size=(1, 1), rx=None, ry=None, **extra):
+        element = Element("rect", extra)
+        element.attribs.update(x=insert[0], y=insert[1], width=size[0], height=size[1])
+        if rx is not None:
+            element["rx"] = rx
+        if ry is not None:
+            element["ry"] = ry
+        return element
+
+    def circle(self, center=(0, 0), r=1, **extra):
+        element = Element("circle", extra)
+        element.attribs.update(cx=center[0], cy=center[1], r=r)
+        return element
+
+    def ellipse(self, center=(0, 0), r=(1, 1), **extra):
+        element = Element("ellipse", extra)
+        element.attribs.update(cx=center[0], cy=center[1], rx=r[0], ry=r[1])
+        return element
+
+    def line(self, start=(0, 0), end=(0, 0), **extra):
+        element = Element("line", extra)
+        element.attribs.update(x1=start[0], y1=start[1], x2=end[0], y2=end[1])
+        return element
+
+    def path(self, d=None, **extra):
+        element = Element("path", extra)
+        if d is not None:
+            element["d"] = d
+        return element
+
+    def text(self, text, insert=None, **extra):
+        element = Element("text", extra, text=str(text))
+        if insert is not None:
+            element["x"], element["y"] = insert[0], insert[1]
+        return element
+
+    def g(self, **extra):
+        return Element("g", extra)
+
+    def style(self, content="", **extra):
+        return Style(content, **extra)
+
+    def filter(self, start=None, size=None, **extra):
+        element = Filter("filter", extra)
+        _region(element, start, size)
+        return element
+
+    def linearGradient(self, start=None, end=None, **extra):
+        element = Gradient("linearGradient", extra)
+        if start is not None:
+            element["x1"], element["y1"] = start[0], start[1]
+        if end is not None:
+            element["x2"], element["y2"] = end[0], end[1]
+        return element
+
+    def radialGradient(self, center=None, r=None, focal=None, **extra):
+        element = Gradient("radialGradient", extra)
+        if center is not None:
+            element["cx"], element["cy"] = center[0], center[1]
+        if r is not None:
+            element["r"] = r
+        if focal is not None:
+            element["fx"], element["fy"] = focal[0], focal[1]
+        return element
+
+    def tostring(self):
+        root = Element("svg")
+        root.attribs.update(self.attribs)
+        root.attribs.update({
+            "baseProfile": "full",
+            "version": "1.1",
+            "xmlns": SVG_NS,
+            "xmlns:ev": EV_NS,
+            "xmlns:xlink": XLINK_NS,
+        })
+        out = [root.open_tag() + ">"]
+        if self.defs._parts:
+            out.append("<defs>")
+            out.extend(self.defs._parts)
+            out.append("</defs>")
+        else:
+            out.append("<defs />")
+        out.extend(self._parts)
+        out.append("</svg>")
+        return "".join(out)
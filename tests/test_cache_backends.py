@@ -0,0 +1,169 @@
+"""
+Cache backend checks. RedisCache runs against a small in-process stand-in
+that speaks the RESP2 subset the client uses (AUTH, SELECT, GET, SET PX,
+DEL, SCAN), so no Redis server is needed.
+"""
+
+import asyncio
+import fnmatch
+import socketserver
+import threading
+import time
+
+import pytest
+
+from utils.cache import MemoryCache, RedisCache, RESPConnection, SQLiteCache, aget, aset
+
+
+class _RESPStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password=None):
+        super().__init__(("127.0.0.1", 0), _RESPHandler)
+        self.password = password
+        self.data = {}  # key -> (value, expires_at or None)
+        self.commands = []
+        self.lock = threading.Lock()
+
+
+class _RESPHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    @staticmethod
+    def _bulk(value):
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self):
+        server = self.server
+        authed = server.password is None
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            command = args[0].upper()
+            server.commands.append(command)
+            with server.lock:
+                if command == b"AUTH":
+                    authed = args[1].decode() == server.password
+                    reply = b"+OK\r\n" if authed else b"-ERR invalid password\r\n"
+                elif not authed:
+                    reply = b"-NOAUTH Authentication required.\r\n"
+                elif command == b"SELECT":
+                    reply = b"+OK\r\n"
+                elif command == b"GET":
+                    value, expires_at = server.data.get(args[1], (None, None))
+                    if expires_at is not None and expires_at <= time.time():
+                        server.data.pop(args[1], None)
+                        value = None
+                    reply = self._bulk(value)
+                elif command == b"SET":
+                    expires_at = None
+                    if len(args) >= 5 and args[3].upper() == b"PX":
+                        expires_at = time.time() + int(args[4]) / 1000
+                    server.data[args[1]] = (args[2], expires_at)
+                    reply = b"+OK\r\n"
+                elif command == b"DEL":
+                    deleted = sum(1 for key in args[1:] if server.data.pop(key, None) is not None)
+                    reply = b":%d\r\n" % deleted
+                elif command == b"SCAN":
+                    pattern = args[args.index(b"MATCH") + 1].decode()
+                    keys = [key for key in server.data if fnmatch.fnmatchcase(key.decode(), pattern)]
+                    reply = b"*2\r\n" + self._bulk(b"0") + b"*%d\r\n" % len(keys) + b"".join(map(self._bulk, keys))
+                else:
+                    reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+
+@pytest.fixture
+def resp_server():
+    server = _RESPStandIn(password="s3cret")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _redis_cache(server, namespace="test"):
+    host, port = server.server_address
+    return RedisCache(url=f"redis://:s3cret@{host}:{port}/2", namespace=namespace)
+
+
+def test_redis_round_trip_and_auth(resp_server):
+    cache = _redis_cache(resp_server)
+    assert cache.get("missing") is None
+    cache.set("card", {"svg": "<svg/>", "n": [1, 2]})
+    assert cache.get("card") == {"svg": "<svg/>", "n": [1, 2]}
+    assert resp_server.commands[:2] == [b"AUTH", b"SELECT"]
+    assert b"gitcanvas:test:card" in resp_server.data
+
+
+def test_redis_ttl_delete_and_namespaced_clear(resp_server):
+    cache = _redis_cache(resp_server)
+    other = _redis_cache(resp_server, namespace="other")
+    cache.set("short", 1, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    other.set("a", 3)
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    cache.delete("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.get("b") is None
+    assert other.get("a") == 3
+
+
+def test_redis_reconnects_after_dropped_connection(resp_server):
+    cache = _redis_cache(resp_server)
+    cache.set("k", "v")
+    cache.conn._sock.close()  # simulate the server dropping the socket
+    assert cache.get("k") == "v"
+
+
+def test_redis_down_degrades_to_misses():
+    host, port = "127.0.0.1", 1  # nothing listens here
+    cache = RedisCache(connection=RESPConnection(host=host, port=port, timeout=0.2))
+    assert cache.get("k") is None
+    cache.set("k", "v")
+    assert cache._down_until > time.monotonic()
+
+
+def test_sqlite_hits_do_not_write_until_flushed(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), namespace="t", max_entries=10)
+    cache.set("k", {"v": 1})
+    before = cache._conn.total_changes
+    assert cache.get("k") == {"v": 1}
+    assert cache._conn.total_changes == before
+    assert "k" in cache._touched
+    cache.set("other", 2)
+    assert not cache._touched
+
+
+def test_sqlite_prunes_least_recently_used(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), namespace="t", max_entries=10)
+    for i in range(100):
+        cache.set(f"k{i}", i)
+    assert len(cache) == 10
+    assert cache.get("k99") == 99
+
+
+def test_async_helpers_use_threads_only_for_blocking_backends(tmp_path):
+    sqlite_cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    memory_cache = MemoryCache()
+
+    async def run():
+        for backend in (sqlite_cache, memory_cache):
+            await aset(backend, "k", [1, 2], ttl=60)
+            assert await aget(backend, "k") == [1, 2]
+
+    asyncio.run(run())
@@ -0,0 +1,65 @@
+"""
+Accept-Encoding negotiation and the precompressed variant store.
+"""
+
+import gzip
+
+import pytest
+
+from utils import compression
+from utils.compression import CompressedVariants, choose_encoding, compress_variants
+
+SVG = "<svg>" + "<rect width=\"10\" height=\"10\"/>" * 50 + "</svg>"
+ALL = ["br", "gzip", "identity"]
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, "identity"),
+    ("", "identity"),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("*;q=0", "identity"),
+    ("deflate", "identity"),
+    ("GZIP", "gzip"),
+    ("gzip;q=oops, identity", "identity"),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, ALL) == expected
+
+
+def test_choose_encoding_only_picks_available_variants():
+    assert choose_encoding("br", ["gzip", "identity"]) == "identity"
+    assert choose_encoding("br, gzip", ["gzip", "identity"]) == "gzip"
+
+
+def test_variants_round_trip_and_are_stable():
+    variants = compress_variants(SVG)
+    assert gzip.decompress(variants["gzip"]).decode("utf-8") == SVG
+    assert compress_variants(SVG)["gzip"] == variants["gzip"]
+    if compression.brotli is not None:
+        assert compression.brotli.decompress(variants["br"]).decode("utf-8") == SVG
+
+
+def test_encodings_that_do_not_shrink_the_card_are_dropped():
+    assert compress_variants("<svg/>") == {"identity": b"<svg/>"}
+
+
+def test_get_ready_never_compresses():
+    store = CompressedVariants(max_bytes=1 << 20)
+    assert store.get_ready('"e1"', SVG, "gzip") is None
+    store.prepare('"e1"', SVG)
+    encoding, body = store.get_ready('"e1"', SVG, "gzip")
+    assert encoding == "gzip" and gzip.decompress(body).decode("utf-8") == SVG
+    assert store.get_ready('"e1"', SVG, None) == ("identity", SVG.encode("utf-8"))
+
+
+def test_get_rebuilds_an_evicted_variant():
+    store = CompressedVariants(max_bytes=1 << 20)
+    store.prepare('"e1"', SVG)
+    store._cache.delete('"e1":gzip')
+    assert store.get_ready('"e1"', SVG, "gzip") is None
+    encoding, body = store.get('"e1"', SVG, "gzip")
+    assert encoding == "gzip" and gzip.decompress(body).decode("utf-8") == SVG
@@ -0,0 +1,64 @@
+"""
+The path grid must cover exactly the cells the rect grid draws, per color.
+"""
+
+import re
+from datetime import date, timedelta
+
+import pytest
+
+from generators.contrib_card import draw_contrib_card
+
+_TAG = re.compile(r"<(rect|path)\b([^>]*)/?>")
+_ATTR = re.compile(r'([\w:-]+)="([^"]*)"')
+_MOVE = re.compile(r"m(-?[\d.]+) (-?[\d.]+)h([\d.]+)v")
+
+
+def _data():
+    start = date(2025, 10, 1)
+    days = [{"date": (start + timedelta(days=i)).isoformat(), "count": (i * 7) % 11} for i in range(365)]
+    return {"username": "octo", "total_commits": 42, "contributions": days}
+
+
+def _cells_from_rects(svg, size):
+    cells = {}
+    for name, body in _TAG.findall(svg):
+        attrs = dict(_ATTR.findall(body))
+        if name == "rect" and attrs.get("width") == str(size) and attrs.get("height") == str(size):
+            cells.setdefault(attrs["fill"], set()).add((float(attrs["x"]), float(attrs["y"])))
+    return cells
+
+
+def _cells_from_paths(svg, size):
+    cells = {}
+    for name, body in _TAG.findall(svg):
+        attrs = dict(_ATTR.findall(body))
+        if name != "path" or "stroke-linejoin" not in attrs:
+            continue
+        radius = float(attrs["stroke-width"]) / 2
+        assert attrs["fill"] == attrs["stroke"]
+        x = y = 0.0
+        for dx, dy, inner in _MOVE.findall(attrs["d"]):
+            x, y = x + float(dx), y + float(dy)
+            assert float(inner) + 2 * radius == size
+            cells.setdefault(attrs["fill"], set()).add((x - radius, y - radius))
+    return cells
+
+
+@pytest.mark.parametrize("theme, size", [("Default", 7), ("Gaming", 7)])
+def test_paths_cover_the_same_cells_as_rects(theme, size):
+    rects = draw_contrib_card(_data(), theme, grid="rects")
+    paths = draw_contrib_card(_data(), theme, grid="paths")
+    expected = _cells_from_rects(rects, size)
+    assert sum(len(cells) for cells in expected.values()) > 300
+    actual = _cells_from_paths(paths, size)
+    # Non-grid cells (the snake's head) stay rects in both modes.
+    for fill, cells in _cells_from_rects(paths, size).items():
+        actual.setdefault(fill, set()).update(cells)
+    assert actual == expected
+    assert len(paths) < len(rects)
+
+
+def test_one_path_per_level():
+    paths = draw_contrib_card(_data(), "Default", grid="paths")
+    assert paths.count("stroke-linejoin") == 5
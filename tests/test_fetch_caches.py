@@ -0,0 +1,131 @@
+"""
+Single-flight coalescing, the profile cache's stale-while-revalidate phases
+and the ETag validator store.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.cache import MemoryCache
+from utils.etag_store import ValidatorStore, validator_key
+from utils.profile_cache import FRESH, MISS, STALE, ProfileCache
+from utils.singleflight import SingleFlight
+
+
+def test_singleflight_coalesces_concurrent_calls_and_shares_errors():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"n": len(calls)}
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream")
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        assert results == [{"n": 1}] * 5
+        assert flight.in_flight() == 0
+        assert await flight.do("k", work) == {"n": 2}  # finished calls are not reused
+        errors = await asyncio.gather(*(flight.do("e", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(error, ValueError) for error in errors)
+
+    asyncio.run(run())
+    assert flight.leaders == 3 and flight.coalesced == 6
+
+
+class _Fetcher:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    async def __call__(self, username, token, fields):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("GitHub down")
+        return {"username": username, "n": self.calls}
+
+
+def _age(cache, key, seconds):
+    entry = cache.backend.get(key)
+    entry["fetched_at"] -= seconds
+    cache.backend.set(key, entry)
+
+
+def test_profile_cache_phases():
+    fetch = _Fetcher()
+    cache = ProfileCache(MemoryCache(), fetch, ttl=10, swr=100, stale_if_error=1000)
+
+    async def run():
+        entry, state = await cache.get("k", "octo", None, frozenset())
+        assert (state, entry["data"]["n"]) == (MISS, 1)
+        assert (await cache.get("k", "octo", None, frozenset()))[1] == FRESH
+
+        # Stale: served at once, refreshed once in the background.
+        _age(cache, "k", 50)
+        results = [await cache.get("k", "octo", None, frozenset()) for _ in range(3)]
+        assert [state for _, state in results] == [STALE] * 3
+        assert all(entry["data"]["n"] == 1 for entry, _ in results)
+        await asyncio.sleep(0)
+        await asyncio.gather(*cache._background)
+        assert fetch.calls == 2
+        entry, state = await cache.get("k", "octo", None, frozenset())
+        assert (state, entry["data"]["n"]) == (FRESH, 2)
+
+        # Expired and the fetch fails: the old data is still served (stale-if-error).
+        _age(cache, "k", 500)
+        fetch.fail = True
+        entry, state = await cache.get("k", "octo", None, frozenset())
+        assert (state, entry["data"]["n"]) == (STALE, 2)
+
+        # Too old even for that.
+        _age(cache, "k", 1000)
+        assert await cache.get("k", "octo", None, frozenset()) == (None, MISS)
+
+    asyncio.run(run())
+
+
+def test_profile_versions_follow_the_data():
+    fetch = _Fetcher()
+    cache = ProfileCache(MemoryCache(), fetch, ttl=10, swr=0, stale_if_error=0)
+
+    async def run():
+        first = await cache.refresh("k", "octo", None, frozenset())
+        second = await cache.refresh("k", "octo", None, frozenset())
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["version"] != second["version"]
+    assert len(first["version"]) == 16
+
+
+def test_validator_keys_are_scoped_by_credential():
+    url = "https://api.github.com/users/octo"
+    assert validator_key(url) == validator_key(url, {})
+    assert validator_key(url, {"Authorization": "token a"}) != validator_key(url, {"Authorization": "token b"})
+    assert validator_key(url, {"Accept": "x"}) != validator_key(url)
+
+
+def test_validator_store_round_trip(tmp_path):
+    store = ValidatorStore(str(tmp_path / "etags.sqlite3"))
+    assert store.get("k") is None
+    store.set("k", '"abc"', None, '<next>; rel="next"', b"{}")
+    assert store.get("k") == {"etag": '"abc"', "last_modified": None, "link": '<next>; rel="next"', "body": b"{}"}
+
+
+@pytest.mark.parametrize("max_entries, max_age, expected", [(30, 3600, 30), (1000, 0.5, 1)])
+def test_validator_store_prunes_by_size_and_age(tmp_path, max_entries, max_age, expected):
+    store = ValidatorStore(str(tmp_path / "etags.sqlite3"), max_entries=max_entries, max_age=max_age)
+    for i in range(99):
+        store.set(f"k{i}", f'"{i}"', None, None, b"x")
+    if max_age < 1:
+        time.sleep(max_age)
+    store.set("k99", '"99"', None, None, b"x")  # the 100th write prunes
+    (count,) = store._conn.execute("SELECT COUNT(*) FROM validators").fetchone()
+    assert count == expected
+    assert store.get("k99") is not None and store.get("k0") is None
@@ -0,0 +1,75 @@
+"""
+Streak engine and the contributions-API calendar used without a token.
+"""
+
+from datetime import date, timedelta
+
+from utils.github_api import build_rest_profile_data, new_repo_stats, parse_contrib_days
+from utils.streaks import StreakCounter, compute_streak
+
+TODAY = date(2026, 3, 10)
+
+
+def _calendar(counts, end=TODAY):
+    """Days ending on `end`, oldest first."""
+    start = end - timedelta(days=len(counts) - 1)
+    return [{"date": (start + timedelta(days=i)).isoformat(), "count": c} for i, c in enumerate(counts)]
+
+
+def test_current_longest_and_total():
+    streak = compute_streak(_calendar([1, 2, 0, 3, 1, 4, 1]), today=TODAY)
+    assert streak == {"current_streak": 4, "longest_streak": 4, "total_contributions": 12}
+
+
+def test_today_at_zero_keeps_the_streak_through_yesterday():
+    assert compute_streak(_calendar([0, 1, 1, 0]), today=TODAY)["current_streak"] == 2
+
+
+def test_today_missing_from_the_calendar_counts_like_zero():
+    days = _calendar([1, 1, 1], end=TODAY - timedelta(days=1))
+    assert compute_streak(days, today=TODAY)["current_streak"] == 3
+
+
+def test_streak_that_ended_before_yesterday_is_not_current():
+    days = _calendar([1, 1, 1, 0, 0, 0])
+    assert compute_streak(days, today=TODAY) == {"current_streak": 0, "longest_streak": 3, "total_contributions": 3}
+    old = _calendar([1, 1], end=TODAY - timedelta(days=5))
+    assert compute_streak(old, today=TODAY)["current_streak"] == 0
+
+
+def test_missing_days_break_runs():
+    days = _calendar([1, 1, 1], end=TODAY - timedelta(days=4)) + _calendar([1, 1])
+    assert compute_streak(days, today=TODAY) == {"current_streak": 2, "longest_streak": 3, "total_contributions": 5}
+
+
+def test_days_after_tomorrow_are_ignored():
+    days = _calendar([1, 1]) + _calendar([0, 0, 0], end=TODAY + timedelta(days=3))[1:]
+    # TODAY+1 (0) is kept as a timezone-ahead "today"; TODAY+2 and +3 are dropped.
+    assert compute_streak(days, today=TODAY)["current_streak"] == 2
+
+
+def test_re_appending_the_last_date_replaces_its_count():
+    counter = StreakCounter().extend(_calendar([1, 1, 0]))
+    assert counter.as_dict(TODAY)["current_streak"] == 2
+    counter.append(TODAY.isoformat(), 3)
+    assert counter.as_dict(TODAY) == {"current_streak": 3, "longest_streak": 3, "total_contributions": 5}
+    counter.append(TODAY.isoformat(), 0)
+    assert counter.as_dict(TODAY) == {"current_streak": 2, "longest_streak": 2, "total_contributions": 2}
+
+
+def test_contrib_api_days_feed_the_rest_fallback():
+    payload = {
+        "total": {"2025": 4, "2026": 3},
+        "contributions": [
+            {"date": "2026-12-31", "count": 0, "level": 0},
+            {"date": TODAY.isoformat(), "count": 2, "level": 1},
+            {"date": (TODAY - timedelta(days=1)).isoformat(), "count": 1, "level": 1},
+            {"date": "2024-01-01", "count": 5, "level": 4},
+        ],
+    }
+    days = parse_contrib_days(payload, today=TODAY)
+    assert [day["date"] for day in days] == [(TODAY - timedelta(days=1)).isoformat(), TODAY.isoformat()]
+
+    data = build_rest_profile_data("octo", {}, new_repo_stats(), 7, None, days)
+    assert data["contributions"] == days
+    assert data["streak_data"]["total_contributions"] == 3
@@ -0,0 +1,130 @@
+"""
+svg_optimize: each rewrite on a minimal input, then whole cards.
+"""
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from generators import contrib_card, lang_card, stats_card, streak_card
+from utils.svg_optimize import OptimizeStats, optimize
+
+NS = 'xmlns="http://www.w3.org/2000/svg"'
+
+
+def _svg(body, extra=""):
+    return f'<svg {NS}{extra}>{body}</svg>'
+
+
+def test_rounds_geometry_to_the_precision():
+    out = optimize(_svg('<path d="M 1.23456 2.0001 L 3.5 4"/><rect width="10.005" height="-0.001"/>'), precision=2)
+    assert 'd="M 1.23 2 L 3.5 4"' in out
+    assert 'width="10.01"' in out or 'width="10"' in out  # float rounding of a half
+    assert 'height="0"' in out
+    assert 'd="M 1 2 L 4 4"' in optimize(_svg('<path d="M 1.23456 2.0001 L 3.5 4"/>'), precision=0)
+
+
+def test_leaves_non_geometry_and_text_alone():
+    out = optimize(_svg('<text x="1.23456" fill="#123.456">v1.23456  </text>'), precision=1)
+    assert 'x="1.2"' in out
+    assert 'fill="#123.456"' in out
+    assert ">v1.23456  </text>" in out
+
+
+def test_drops_default_valued_attributes():
+    out = optimize(_svg('<rect x="0" y="0.000" width="5" opacity="1" font-weight="normal"/><circle cx="0" r="2"/>'))
+    assert "<rect width=\"5\"/>" in out
+    assert '<circle r="2"/>' in out
+
+
+def test_keeps_element_defaults_that_differ_elsewhere():
+    # x="0" on a filter is not its default (-10%), so it stays.
+    out = optimize(_svg('<defs><filter id="f" x="0" y="0"/></defs><rect filter="url(#f)"/>'))
+    assert 'x="0"' in out and 'y="0"' in out
+
+
+def test_inherited_defaults_survive_under_an_overriding_ancestor():
+    out = optimize(_svg('<g stroke-width="2"><path d="M0 0" stroke-width="1"/></g><path d="M1 1" stroke-width="1"/>'))
+    assert '<path d="M0 0" stroke-width="1"/>' in out
+    assert '<path d="M1 1"/>' in out
+
+
+def test_class_or_style_on_an_ancestor_blocks_inherited_drops():
+    out = optimize(_svg('<g class="t"><text text-anchor="start">a</text></g>'))
+    assert 'text-anchor="start"' in out
+
+
+def test_merges_duplicate_defs_and_rewrites_references():
+    gradient = '<linearGradient id="{}"><stop offset="0" stop-color="red"/></linearGradient>'
+    svg = _svg(
+        "<defs>" + gradient.format("first") + gradient.format("second") + "</defs>"
+        '<rect fill="url(#first)"/><rect fill="url(#second)"/>'
+    )
+    out = optimize(svg)
+    assert out.count("<linearGradient") == 1
+    assert out.count('fill="url(#a)"') == 2
+    assert 'id="a"' in out
+
+
+def test_joins_style_blocks_and_minifies_css():
+    svg = _svg(
+        '<defs><style type="text/css"><![CDATA[ .a { fill : red; } ]]></style>'
+        '<style type="text/css"><![CDATA[/* c */ .b {stroke: blue;}]]></style></defs>'
+    )
+    out = optimize(svg)
+    assert out.count("<style") == 1
+    assert "<![CDATA[.a{fill:red}.b{stroke:blue}]]>" in out
+
+
+def test_shortens_ids_but_keeps_ids_used_from_css():
+    svg = _svg(
+        '<defs><style type="text/css"><![CDATA[#keepme{opacity:.5}]]></style>'
+        '<clipPath id="someLongClipName"><rect width="4"/></clipPath></defs>'
+        '<g id="keepme" clip-path="url(#someLongClipName)"/><use href="#someLongClipName"/>'
+    )
+    out = optimize(svg)
+    assert 'id="keepme"' in out
+    assert "someLongClipName" not in out
+    assert 'clip-path="url(#a)"' in out and 'href="#a"' in out
+
+
+def test_strips_whitespace_between_tags_but_not_inside_text():
+    out = optimize(_svg('\n  <g>\n    <text> two  words </text>\n  </g>\n'))
+    assert out == f'<svg {NS}><g><text> two  words </text></g></svg>'
+
+
+def test_drops_unused_namespace_declarations():
+    extra = ' xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:ev="http://www.w3.org/2001/xml-events"'
+    assert "xmlns:xlink" not in optimize(_svg("<g/>", extra))
+    used = optimize(_svg('<defs><rect id="r"/></defs><use xlink:href="#r"/>', extra))
+    assert "xmlns:xlink" in used and "xmlns:ev" not in used
+
+
+DATA = {
+    "username": "octo",
+    "total_stars": 12, "total_commits": 345, "public_repos": 6, "followers": 7,
+    "top_languages": [("Python", 10), ("Rust", 3)],
+    "contributions": [{"date": f"2025-{1 + i // 28:02d}-{1 + i % 28:02d}", "count": i % 6} for i in range(300)],
+    "streak_data": {"current_streak": 3, "longest_streak": 9, "total_contributions": 120},
+}
+
+
+@pytest.mark.parametrize("theme", ["Default", "Glass", "Gaming", "Stranger_things"])
+@pytest.mark.parametrize("draw", [
+    stats_card.draw_stats_card, lang_card.draw_lang_card, contrib_card.draw_contrib_card, streak_card.draw_streak_card,
+])
+def test_cards_shrink_and_stay_well_formed(draw, theme):
+    svg = draw(DATA, theme)
+    out = optimize(svg)
+    assert len(out) < len(svg)
+    ET.fromstring(out)
+    assert optimize(out) == out
+
+
+def test_optimize_stats_totals_per_card():
+    stats = OptimizeStats()
+    stats.record("stats", 1000, 800)
+    stats.record("stats", 500, 300)
+    assert stats.stats() == {
+        "stats": {"cards": 2, "bytes_in": 1500, "bytes_out": 1100, "bytes_saved": 400, "avg_bytes_saved": 200}
+    }
@@ -0,0 +1,58 @@
+"""
+Slot templates must fill to exactly what drawing the card directly writes.
+"""
+
+import pytest
+
+from generators import lang_card, stats_card
+from generators.svg_template import SvgTemplate, freeze, slot
+from generators.svg_writer import Drawing
+
+# Non-empty only: the writer leaves out empty attributes and text, a template can't.
+TRICKY = ['plain', 'a<b>&c', 'say "hi"', "tab\tnew\nline", "it's"]
+
+
+def _draw(name, title):
+    dwg = Drawing(size=("100%", "100%"))
+    dwg.add(dwg.text(title, insert=(10, 20), class_="title"))
+    dwg.add(dwg.rect(insert=(0, 0), size=(title, 10), fill=name))
+    dwg.add(dwg.text(f"{name}'s card", insert=(5, 5), data_name=name))
+    return dwg.tostring()
+
+
+@pytest.mark.parametrize("value", TRICKY)
+def test_fill_matches_direct_drawing(value):
+    template = SvgTemplate(_draw(slot("name"), slot("title")))
+    assert len(template.slots) == 5
+    assert template.fill({"name": value, "title": value}) == _draw(value, value)
+
+
+def test_values_are_stringified():
+    template = SvgTemplate(_draw(slot("name"), slot("title")))
+    assert template.fill({"name": 3, "title": 42.5}) == _draw("3", "42.5")
+
+
+def test_svg_without_slots_fills_to_itself():
+    svg = _draw("x", "y")
+    assert SvgTemplate(svg).fill({}) == svg
+
+
+def test_freeze_is_order_independent():
+    assert freeze({"b": 1, "a": 2}) == freeze({"a": 2, "b": 1})
+    assert freeze(None) is None and freeze({}) is None
+
+
+def test_stats_card_template_is_reused_and_escapes_values():
+    data = {"username": "<octo&cat>", "total_stars": 5, "total_commits": 7, "public_repos": 2, "followers": 1}
+    stats_card._stats_template.cache_clear()
+    first = stats_card.draw_stats_card(data, "Default")
+    second = stats_card.draw_stats_card({**data, "username": "other"}, "Default")
+    assert "&lt;octo&amp;cat&gt;'s Stats" in first and "<octo" not in first
+    assert "other's Stats" in second
+    assert stats_card._stats_template.cache_info().hits == 1
+
+
+def test_lang_card_rows_fill_names_percentages_and_bars():
+    svg = lang_card.draw_lang_card({"top_languages": [("C++", 3), ("Go", 1)]}, "Default")
+    assert "C++" in svg and "75.0%" in svg and "25.0%" in svg
+    assert f'width="{0.75 * lang_card.BAR_WIDTH}"' in svg
@@ -0,0 +1,32 @@
+"""
+Compiled theme classes: every bundled theme must produce valid CSS.
+"""
+
+import re
+
+import pytest
+
+from themes.styles import THEME_CLASSES, THEMES, theme_classes
+
+_LENGTH = re.compile(r"\d+(?:\.\d+)?(?:px|em|rem|pt|%)")
+
+
+@pytest.mark.parametrize("name", sorted(THEMES))
+def test_font_sizes_are_valid_lengths(name):
+    css, _ = theme_classes(THEMES[name], *THEME_CLASSES)
+    sizes = re.findall(r"font-size:([^;}]*)", css)
+    assert sizes
+    for size in sizes:
+        assert _LENGTH.fullmatch(size), f"{name}: font-size {size!r}"
+
+
+def test_class_names_are_scoped_per_theme():
+    _, default = theme_classes(THEMES["Default"], "title")
+    _, recolored = theme_classes({**THEMES["Default"], "title_color": "#ff0000"}, "title")
+    assert default["title"] != recolored["title"]
+    assert theme_classes(THEMES["Default"], "title")[1] == default
+
+
+def test_custom_colors_cannot_break_out_of_the_rule():
+    css, _ = theme_classes({**THEMES["Default"], "title_color": "red}body{x:y"}, "title-fill")
+    assert css.count("{") == css.count("}") == 1
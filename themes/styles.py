@@ -62,8 +62,11 @@ THEMES = {
     "text_font_size": 14
     }
 }
+import hashlib
 import json
 import os
+import re
+from functools import lru_cache
 
 
 
@@ -86,3 +89,64 @@ THEMES["Ocean"] = {
     "title_font_size": 20,
     "text_font_size": 14
 }
+
+
+# --- Class-based styling ---
+# Each theme compiles into one small <style> block; generators put these
+# classes on elements instead of repeating fill/font attributes inline, and a
+# cached card is restyled by swapping that block. Declarations are templates
+# over the theme's keys. The "-fill"/"-stroke"/"font" roles carry only a color
+# or font, for elements that keep their own size and weight.
+THEME_CLASSES = {
+    "bg": {"fill": "{bg_color}", "stroke": "{border_color}", "stroke-width": "2"},
+    "title": {"fill": "{title_color}", "font-family": "{font_family}",
+              "font-size": "{title_font_size}", "font-weight": "bold"},
+    "text": {"fill": "{text_color}", "font-family": "{font_family}", "font-size": "{text_font_size}"},
+    "label": {"fill": "{text_color}", "font-family": "{font_family}", "font-size": "9px", "opacity": "0.8"},
+    "icon": {"fill": "{icon_color}"},
+    "bg-fill": {"fill": "{bg_color}"},
+    "title-fill": {"fill": "{title_color}"},
+    "text-fill": {"fill": "{text_color}"},
+    "icon-stroke": {"stroke": "{icon_color}"},
+    "border-stroke": {"stroke": "{border_color}"},
+    "font": {"font-family": "{font_family}"},
+}
+
+# Custom colors come from query strings: keep CSS values to plain tokens.
+_CSS_UNSAFE = re.compile(r"[^\w\s#%.,'()+-]")
+_BARE_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _css_length(value):
+    # Theme files store font sizes both as numbers (20) and as lengths ("18px").
+    text = str(value).strip()
+    return f"{text}px" if _BARE_NUMBER.fullmatch(text) else text
+
+
+@lru_cache(maxsize=256)
+def _compile_theme_rules(theme_items):
+    values = {**THEMES["Default"], **dict(theme_items)}
+    for name in ("title_font_size", "text_font_size"):
+        values[name] = _css_length(values[name])
+    bodies = {
+        role: ";".join(
+            f"{prop}:{_CSS_UNSAFE.sub('', template.format_map(values))}"
+            for prop, template in declarations.items()
+        )
+        for role, declarations in THEME_CLASSES.items()
+    }
+    # Class names differ per compiled theme, so two cards inlined into the
+    # same page (README, dashboard) don't restyle each other.
+    suffix = hashlib.sha1("".join(bodies.values()).encode("utf-8")).hexdigest()[:6]
+    return suffix, bodies
+
+
+def theme_classes(theme, *roles):
+    """
+    CSS and class names for the given THEME_CLASSES roles of a resolved theme
+    dict (custom colors applied): (css, {role: class name}).
+    """
+    suffix, bodies = _compile_theme_rules(tuple(sorted(theme.items())))
+    classes = {role: f"t-{role}-{suffix}" for role in roles}
+    css = "".join(f".{classes[role]}{{{bodies[role]}}}" for role in roles)
+    return css, classes
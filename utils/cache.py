@@ -0,0 +1,425 @@
+"""
+Cache backends used by the API's data and render layers.
+
+Backends store values under string keys with an optional TTL in seconds and
+expose get / set / delete / clear:
+
+- MemoryCache: in-process LRU, bounded by entry count and optionally bytes.
+  Fast, but private to one worker and lost on restart.
+- SQLiteCache: one SQLite file that every worker on the host shares and that
+  survives restarts.
+- RedisCache: any server speaking the Redis protocol (Redis, Valkey, a local
+  stand-in), through a minimal RESP client over a plain socket.
+
+Shared backends store JSON, so values must be JSON-serialisable (tuples come
+back as lists). get_backend(namespace) builds the backend selected by
+CACHE_BACKEND ("memory", "sqlite" or "redis"); a shared backend that can't be
+reached degrades to misses instead of failing requests.
+
+SQLite and Redis calls block on disk or the network; async code goes through
+aget / aset, which run them in a thread (MemoryCache stays inline).
+"""
+
+import asyncio
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+DEFAULT_SQLITE_PATH = os.path.join(".cache", "gitcanvas_cache.sqlite3")
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+
+
+def _sizeof(value):
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return 0
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+class MemoryCache:
+    """
+    In-process LRU cache with per-entry expiry, bounded by entry count and,
+    when max_bytes is given, by the total size of its str/bytes values.
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        if max_entries is None:
+            max_entries = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at or None, value, size)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, size = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self.size -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        size = _sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[2]
+            self._entries[key] = (expires_at, value, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or (self.max_bytes and self.size > self.max_bytes):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    Cache table in a SQLite file shared by all workers on the host. Entries
+    past max_entries are pruned least recently used first.
+
+    Reads don't write: hits are remembered and their accessed_at is updated
+    in one batch every TOUCH_BATCH hits or TOUCH_INTERVAL seconds, and on the
+    next write. Expired rows are left to pruning.
+    """
+
+    blocking = True
+    TOUCH_BATCH = 100
+    TOUCH_INTERVAL = 30
+
+    def __init__(self, path, namespace="default", max_entries=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if max_entries is None:
+            max_entries = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._writes = 0
+        self._touched = {}  # key -> last hit, not yet written
+        self._last_touch_flush = time.time()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH or now - self._last_touch_flush >= self.TOUCH_INTERVAL:
+                self._flush_touched(now)
+                self._conn.commit()
+        return json.loads(value)
+
+    def _flush_touched(self, now):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                [(accessed_at, self.namespace, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched.clear()
+        self._last_touch_flush = now
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, _dumps(value), expires_at, now),
+            )
+            self._touched.pop(key, None)
+            self._flush_touched(now)
+            self._writes += 1
+            # Pruning scans the table, so only do it every so often.
+            if self._writes % 100 == 0:
+                self._prune(now)
+            self._conn.commit()
+
+    def _prune(self, now):
+        self._conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.namespace, now),
+        )
+        self._conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND key IN ("
+            "SELECT key FROM cache WHERE namespace = ? ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_entries),
+        )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+
+class RedisError(Exception):
+    pass
+
+
+class RESPConnection:
+    """Minimal Redis protocol (RESP2) client: one socket, one command at a time."""
+
+    def __init__(self, host="localhost", port=6379, db=0, password=None, timeout=2.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url):
+        parsed = urlparse(url)
+        db = parsed.path.lstrip("/")
+        return cls(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+        )
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    @staticmethod
+    def _encode(args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode("utf-8")
+            elif not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            raise RedisError(payload.decode("utf-8"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("connection closed by server")
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RedisError(f"unexpected reply type {kind!r}")
+
+    def _call(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def execute(self, *args):
+        """Sends one command and returns its decoded reply; reconnects once on a dropped socket."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._call(*args)
+                except (ConnectionError, socket.timeout, OSError):
+                    self._close()
+                    if attempt:
+                        raise
+
+
+class RedisCache:
+    """Cache on a Redis-protocol server, shared by every worker that points at it."""
+
+    blocking = True
+
+    # After a connection failure, skip the server for this long instead of
+    # paying a connect timeout on every request.
+    RETRY_AFTER = 30
+
+    def __init__(self, url=None, namespace="default", connection=None):
+        self.namespace = namespace
+        self.conn = connection or RESPConnection.from_url(url or os.getenv("CACHE_REDIS_URL", DEFAULT_REDIS_URL))
+        self._down_until = 0
+
+    def _key(self, key):
+        return f"gitcanvas:{self.namespace}:{key}"
+
+    def _execute(self, *args):
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return self.conn.execute(*args)
+        except RedisError as e:
+            print(f"Redis cache Error: {e}")
+        except OSError as e:
+            print(f"Redis cache unavailable for {self.RETRY_AFTER}s: {e}")
+            self._down_until = time.monotonic() + self.RETRY_AFTER
+        return None
+
+    def get(self, key):
+        raw = self._execute("GET", self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        args = ["SET", self._key(key), _dumps(value)]
+        if ttl:
+            args += ["PX", max(1, int(ttl * 1000))]
+        self._execute(*args)
+
+    def delete(self, key):
+        self._execute("DEL", self._key(key))
+
+    def clear(self):
+        cursor = "0"
+        while True:
+            reply = self._execute("SCAN", cursor, "MATCH", self._key("*"), "COUNT", 500)
+            if not reply:
+                return
+            cursor, keys = reply[0].decode("utf-8"), reply[1]
+            if keys:
+                self._execute("DEL", *keys)
+            if cursor == "0":
+                return
+
+
+async def aget(backend, key):
+    """backend.get for async code: blocking backends run in a worker thread."""
+    if backend.blocking:
+        return await asyncio.to_thread(backend.get, key)
+    return backend.get(key)
+
+
+async def aset(backend, key, value, ttl=None):
+    if backend.blocking:
+        return await asyncio.to_thread(backend.set, key, value, ttl)
+    return backend.set(key, value, ttl)
+
+
+_sqlite_caches = {}
+_sqlite_lock = threading.Lock()
+
+
+def get_backend(namespace, **memory_options):
+    """
+    Builds the cache backend selected by CACHE_BACKEND for one layer
+    ("profile", "render", ...). memory_options go to MemoryCache, which is
+    also the fallback when a shared backend can't be set up.
+    """
+    kind = os.getenv("CACHE_BACKEND", "memory").strip().lower()
+    try:
+        if kind == "sqlite":
+            path = os.getenv("CACHE_SQLITE_PATH", DEFAULT_SQLITE_PATH)
+            with _sqlite_lock:
+                key = (path, namespace)
+                if key not in _sqlite_caches:
+                    _sqlite_caches[key] = SQLiteCache(path, namespace=namespace)
+                return _sqlite_caches[key]
+        if kind == "redis":
+            return RedisCache(namespace=namespace)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Cache backend {kind} unavailable, using memory: {e}")
+    return MemoryCache(**memory_options)
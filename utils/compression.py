@@ -0,0 +1,118 @@
+"""
+Precompressed variants of rendered cards.
+
+Each card is compressed once per ETag -- gzip always, brotli when the
+optional `brotli` package is installed -- and the bytes are kept in a
+byte-bounded in-process LRU (COMPRESSED_CACHE_MAX_BYTES, default 16 MiB),
+so requests only pick a variant by Accept-Encoding instead of compressing.
+Compressing is CPU-bound (gzip level 9, brotli quality 11); the API runs
+prepare() and get() in a thread and only calls get_ready() on the loop.
+"""
+
+import gzip
+import os
+
+from utils.cache import MemoryCache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip covers every client
+    brotli = None
+
+# Preference order when a client accepts several encodings equally.
+PREFERRED = ("br", "gzip", "identity")
+
+
+def compress_variants(svg_content):
+    """Returns {encoding: body bytes}; encoded variants are only kept when smaller."""
+    raw = svg_content.encode("utf-8")
+    variants = {"identity": raw}
+    # mtime=0 keeps the gzip bytes stable for identical input.
+    compressed = {"gzip": gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed["br"] = brotli.compress(raw, mode=brotli.MODE_TEXT, quality=11)
+    for encoding, body in compressed.items():
+        if len(body) < len(raw):
+            variants[encoding] = body
+    return variants
+
+
+def parse_accept_encoding(header):
+    """Returns {coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header, available):
+    """Picks the best of `available` encodings the client accepts, or "identity"."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*")
+
+    def weight(encoding):
+        if encoding in accepted:
+            return accepted[encoding]
+        if encoding == "identity":
+            return 1.0 if wildcard is None or wildcard > 0 else 0.0
+        return wildcard or 0.0
+
+    best = max(
+        (encoding for encoding in PREFERRED if encoding in available),
+        key=lambda encoding: (weight(encoding), -PREFERRED.index(encoding)),
+    )
+    return best if weight(best) > 0 else "identity"
+
+
+class CompressedVariants:
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = int(os.getenv("COMPRESSED_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+        self._cache = MemoryCache(max_entries=float("inf"), max_bytes=max_bytes)
+
+    def prepare(self, etag, svg_content):
+        """Compresses a card once; returns the encodings available for it."""
+        available = self._cache.get(etag)
+        if available is None:
+            variants = compress_variants(svg_content)
+            for encoding, body in variants.items():
+                if encoding != "identity":
+                    self._cache.set(f"{etag}:{encoding}", body)
+            available = " ".join(variants)
+            self._cache.set(etag, available)
+        return available.split()
+
+    def get_ready(self, etag, svg_content, accept_encoding):
+        """Like get(), but returns None instead of compressing anything."""
+        available = self._cache.get(etag)
+        if available is None:
+            return None
+        encoding = choose_encoding(accept_encoding, available.split())
+        if encoding == "identity":
+            return encoding, svg_content.encode("utf-8")
+        body = self._cache.get(f"{etag}:{encoding}")
+        return (encoding, body) if body is not None else None
+
+    def get(self, etag, svg_content, accept_encoding):
+        """Returns (encoding, body) for the client, compressing the card on first use."""
+        encoding = choose_encoding(accept_encoding, self.prepare(etag, svg_content))
+        if encoding == "identity":
+            return encoding, svg_content.encode("utf-8")
+        body = self._cache.get(f"{etag}:{encoding}")
+        if body is None:
+            # The variant was evicted on its own; rebuild just this one.
+            body = compress_variants(svg_content).get(encoding)
+            if body is None:
+                return "identity", svg_content.encode("utf-8")
+        return encoding, body
@@ -0,0 +1,127 @@
+"""
+Persistent per-URL validator store for conditional GitHub REST requests.
+
+GitHub answers `If-None-Match` / `If-Modified-Since` with `304 Not Modified`
+when nothing changed, and 304s are not counted against the REST rate limit.
+We keep the validators plus the last body for each URL in a small SQLite file
+so re-rendering a popular user costs no budget until their data changes.
+
+The database lives at GITHUB_ETAG_DB (default .cache/github_etags.sqlite3);
+set it to an empty string to disable the store. Entries not used for
+GITHUB_ETAG_MAX_AGE seconds (default 7 days) are dropped, and at most
+GITHUB_ETAG_MAX_ENTRIES (default 20000) of the most recently used are kept.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB_PATH = os.path.join(".cache", "github_etags.sqlite3")
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+def validator_key(url, headers=None):
+    """
+    Keys entries by URL, Accept and the credential used: authenticated
+    responses can include private data, so they are never shared across tokens.
+    """
+    headers = headers or {}
+    scope = "|".join([url, headers.get("Accept", ""), headers.get("Authorization", "")])
+    return hashlib.sha256(scope.encode("utf-8")).hexdigest()
+
+
+class ValidatorStore:
+    def __init__(self, path, max_entries=None, max_age=None):
+        self.max_entries = int(_env_float("GITHUB_ETAG_MAX_ENTRIES", 20000)) if max_entries is None else max_entries
+        self.max_age = _env_float("GITHUB_ETAG_MAX_AGE", 7 * 24 * 3600) if max_age is None else max_age
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL only needs fsync at checkpoints; losing the last validators on a crash is harmless.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS validators (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                link TEXT,
+                body BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+        # stored_at is refreshed on every 304, so it doubles as last use.
+        self._conn.execute("CREATE INDEX IF NOT EXISTS validators_lru ON validators (stored_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        """Returns {'etag', 'last_modified', 'link', 'body'} or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, link, body FROM validators WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, link, body = row
+        return {"etag": etag, "last_modified": last_modified, "link": link, "body": body}
+
+    def set(self, key, etag, last_modified, link, body):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO validators (key, etag, last_modified, link, body, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, link, body, now),
+            )
+            self._writes += 1
+            # Pruning scans the table, so only do it every so often.
+            if self._writes % 100 == 0:
+                self._prune(now)
+            self._conn.commit()
+
+    def _prune(self, now):
+        self._conn.execute("DELETE FROM validators WHERE stored_at <= ?", (now - self.max_age,))
+        self._conn.execute(
+            "DELETE FROM validators WHERE key IN ("
+            "SELECT key FROM validators ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def touch(self, key):
+        with self._lock:
+            self._conn.execute("UPDATE validators SET stored_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Returns the shared store, or None when disabled or the file can't be opened."""
+    global _store
+    if _store is None:
+        path = os.getenv("GITHUB_ETAG_DB", DEFAULT_DB_PATH)
+        if not path:
+            return None
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = ValidatorStore(path)
+                except (OSError, sqlite3.Error) as e:
+                    print(f"ETag store disabled: {e}")
+                    return None
+    return _store
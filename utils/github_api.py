@@ -1,5 +1,14 @@
-import requests
 import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from utils import http_client, token_pool
+from utils.repo_language_cache import RepoLanguageCache
+from utils.streaks import compute_streak, utc_today
 
 try:
     from dotenv import load_dotenv
@@ -11,41 +20,70 @@ GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
 if load_dotenv:
     load_dotenv()
 
+# Shared worker pool for the concurrent fan-out in get_live_github_data.
+_FETCH_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GITHUB_FETCH_WORKERS", "16")),
+    thread_name_prefix="github-fetch",
+)
 
+# Separate pool for repo page requests, so a paginating fan-out task never
+# waits on work queued behind itself in _FETCH_POOL.
+_PAGE_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GITHUB_PAGE_WORKERS", "16")),
+    thread_name_prefix="github-pages",
+)
 
-def fetch_github_graphql(username, token=None):
-    if not token:
-        token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        return None
+# Byte-weighted language sizes per repo, kept until the repo's pushedAt changes.
+_LANGUAGE_CACHE = RepoLanguageCache()
 
-    query = """
-    query ($login: String!) {
-      user(login: $login) {
-        contributionsCollection {
-          totalCommitContributions
-          contributionCalendar {
-            weeks {
-              contributionDays {
-                date
-                contributionCount
-              }
-            }
+# Last successful fetch per username, served when the token pool is nearly exhausted.
+_LAST_GOOD = OrderedDict()
+_LAST_GOOD_LOCK = threading.Lock()
+_LAST_GOOD_SIZE = int(os.getenv("LAST_GOOD_CACHE_SIZE", "1000"))
+
+
+def call_timeout():
+    """Per-call timeout (seconds) for each upstream request in the fan-out."""
+    try:
+        return float(os.getenv("GITHUB_CALL_TIMEOUT", http_client.DEFAULT_TIMEOUT))
+    except ValueError:
+        return http_client.DEFAULT_TIMEOUT
+
+
+CONTRIBUTIONS_QUERY = """
+query ($login: String!) {
+  user(login: $login) {
+    contributionsCollection {
+      totalCommitContributions
+      contributionCalendar {
+        weeks {
+          contributionDays {
+            date
+            contributionCount
           }
         }
       }
     }
-    """
+  }
+}
+"""
+
+
+def fetch_github_graphql(username, token=None):
+    if not token:
+        token = token_pool.get_pool().acquire("graphql")
+    if not token:
+        return None
 
     headers = {
         "Authorization": f"Bearer {token}"
     }
 
-    resp = requests.post(
+    resp = http_client.post(
         GITHUB_GRAPHQL_URL,
-        json={"query": query, "variables": {"login": username}},
+        json={"query": CONTRIBUTIONS_QUERY, "variables": {"login": username}},
         headers=headers,
-        timeout=10
+        timeout=call_timeout()
     )
 
     if resp.status_code != 200:
@@ -84,107 +122,632 @@ def parse_graphql_contributions(graphql_json):
     return contributions, total_commits, contribution_weeks
 
 
+PROFILE_QUERY = """
+query ($login: String!, $repoCount: Int!) {
+  user(login: $login) {
+    login
+    followers {
+      totalCount
+    }
+    repositories(first: $repoCount, ownerAffiliations: OWNER, privacy: PUBLIC, orderBy: {field: NAME, direction: ASC}) {
+      totalCount
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        id
+        pushedAt
+        stargazerCount
+        primaryLanguage {
+          name
+        }
+      }
+    }
+    contributionsCollection {
+      totalCommitContributions
+      contributionCalendar {
+        weeks {
+          contributionDays {
+            date
+            contributionCount
+          }
+        }
+      }
+    }
+  }
+  rateLimit {
+    cost
+    limit
+    remaining
+    resetAt
+  }
+}
+"""
+
+REPOS_PAGE_QUERY = """
+query ($login: String!, $cursor: String) {
+  user(login: $login) {
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, privacy: PUBLIC, orderBy: {field: NAME, direction: ASC}) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        id
+        pushedAt
+        stargazerCount
+        primaryLanguage {
+          name
+        }
+      }
+    }
+  }
+  rateLimit {
+    cost
+    limit
+    remaining
+    resetAt
+  }
+}
+"""
+
+REPO_LANGUAGES_QUERY = """
+query ($ids: [ID!]!) {
+  nodes(ids: $ids) {
+    ... on Repository {
+      id
+      pushedAt
+      languages(first: 20, orderBy: {field: SIZE, direction: DESC}) {
+        edges {
+          size
+          node {
+            name
+          }
+        }
+      }
+    }
+  }
+  rateLimit {
+    cost
+    limit
+    remaining
+    resetAt
+  }
+}
+"""
+
+# Card field groups: repo pages are only walked when stats or languages are requested.
+ALL_FIELDS = frozenset({"stats", "languages", "contributions"})
+REPO_FIELDS = frozenset({"stats", "languages"})
+
+# Profile data keys that need a field group; the rest (login, followers,
+# public repos, total commits) come back with every fetch.
+DATA_FIELD_GROUPS = {
+    "total_stars": "stats",
+    "top_languages": "languages",
+    "contributions": "contributions",
+    "contribution_weeks": "contributions",
+    "streak_data": "contributions",
+}
+
+
+def fields_for(data_keys):
+    """Field groups to fetch for a card reading `data_keys` (render_pool.CARD_FIELDS)."""
+    return frozenset(DATA_FIELD_GROUPS[key] for key in data_keys if key in DATA_FIELD_GROUPS)
+
+
+def _graphql_post(query, variables, token, root="user"):
+    """POSTs a GraphQL query; returns the JSON body, or None on HTTP or GraphQL errors."""
+    resp = http_client.post(
+        GITHUB_GRAPHQL_URL,
+        json={"query": query, "variables": variables},
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=call_timeout()
+    )
+
+    if resp.status_code != 200:
+        return None
+
+    graphql_json = resp.json()
+    token_pool.get_pool().record_graphql(token, (graphql_json.get("data") or {}).get("rateLimit"))
+    if graphql_json.get("errors") or not (graphql_json.get("data") or {}).get(root):
+        return None
+    return graphql_json
+
+
+def fetch_profile_graphql(username, token=None, fields=None):
+    """
+    Fetches the profile, repo stars, primary languages and the contribution
+    calendar in a single GraphQL round trip. Returns None without a token or
+    on any failure so callers can fall back to the REST fan-out.
+    """
+    if not token:
+        token = token_pool.get_pool().acquire("graphql")
+    if not token:
+        return None
+
+    # Skip the repository page entirely when the card doesn't need it.
+    fields = ALL_FIELDS if fields is None else fields
+    repo_count = 100 if fields & REPO_FIELDS else 0
+    return _graphql_post(PROFILE_QUERY, {"login": username, "repoCount": repo_count}, token)
+
+
+def iter_graphql_repo_pages(username, token, first_connection):
+    """
+    Yields repository node lists page by page, starting from the connection
+    already returned by the profile query and following `endCursor`.
+    """
+    connection = first_connection
+    while True:
+        yield connection.get("nodes") or []
+
+        page_info = connection.get("pageInfo") or {}
+        if not page_info.get("hasNextPage"):
+            return
+        graphql_json = _graphql_post(
+            REPOS_PAGE_QUERY, {"login": username, "cursor": page_info.get("endCursor")}, token
+        )
+        if not graphql_json:
+            return
+        connection = graphql_json["data"]["user"]["repositories"]
+
+
+def fetch_repo_languages(repos, token):
+    """
+    Returns byte-weighted language totals for GraphQL repo nodes.
+
+    Only repos missing from the per-repo cache, or pushed to since they were
+    cached, are fetched; they go out in `nodes(ids:)` batches of
+    GITHUB_LANGUAGE_BATCH ids.
+    """
+    for batch in stale_language_batches(repos):
+        graphql_json = _graphql_post(REPO_LANGUAGES_QUERY, {"ids": batch}, token, root="nodes")
+        if not graphql_json:
+            print(f"Repo languages batch failed ({len(batch)} repos)")
+            continue
+        store_repo_languages(graphql_json["data"]["nodes"])
+
+    return cached_language_totals(repos)
+
+
+def stale_language_batches(repos):
+    """Splits the ids of repos needing a languages refresh into `nodes(ids:)` batches."""
+    stale_ids = _LANGUAGE_CACHE.stale_ids(repos)
+    batch_size = max(1, min(100, int(os.getenv("GITHUB_LANGUAGE_BATCH", "50"))))
+    return [stale_ids[start:start + batch_size] for start in range(0, len(stale_ids), batch_size)]
+
+
+def store_repo_languages(nodes):
+    for node in nodes:
+        if not node:
+            continue
+        sizes = {
+            edge["node"]["name"]: edge["size"]
+            for edge in (node.get("languages") or {}).get("edges", [])
+        }
+        _LANGUAGE_CACHE.set(node["id"], node.get("pushedAt"), sizes)
+
+
+def cached_language_totals(repos):
+    totals = {}
+    for repo in repos:
+        sizes = _LANGUAGE_CACHE.get(repo["id"], repo.get("pushedAt")) or {}
+        for lang, size in sizes.items():
+            totals[lang] = totals.get(lang, 0) + size
+    return totals
+
+
+def parse_profile_graphql(username, graphql_json, token=None, fields=None):
+    """
+    Maps the consolidated profile query onto the `data` dict the generators consume.
+    Remaining repository pages are streamed and aggregated as they arrive.
+    """
+    repositories = graphql_json["data"]["user"]["repositories"]
+
+    # The page iterator is lazy: nothing beyond the first page is fetched unless fields need it.
+    token = token or token_pool.get_pool().acquire("graphql")
+    pages = iter_graphql_repo_pages(username, token, repositories)
+    repo_stats = aggregate_repos(
+        pages, fields=fields, page_languages=lambda page: fetch_repo_languages(page, token)
+    )
+    return build_graphql_profile_data(username, graphql_json, repo_stats)
+
+
+def build_graphql_profile_data(username, graphql_json, repo_stats):
+    user = graphql_json["data"]["user"]
+    contributions, total_commits, contribution_weeks = parse_graphql_contributions(graphql_json)
+
+    return {
+        "username": username,
+        "total_stars": repo_stats["total_stars"],
+        "total_commits": total_commits,
+        "public_repos": user["repositories"].get("totalCount", 0),
+        "followers": user["followers"]["totalCount"],
+        "top_languages": top_languages(repo_stats["languages"]),
+        "contributions": contributions,
+        "contribution_weeks": contribution_weeks,
+        "streak_data": compute_streak(contributions),
+    }
+
+
 def get_github_headers(token=None):
     """
     Build headers for GitHub REST API requests.
-    Uses Authorization header if GITHUB_TOKEN is set.
+    Without an explicit token, uses the pool token (GITHUB_TOKENS / GITHUB_TOKEN)
+    with the most REST budget left.
     """
     headers = {
         "Accept": "application/vnd.github+json"
     }
 
     if not token:
-        token = os.getenv("GITHUB_TOKEN")
+        token = token_pool.get_pool().acquire("core")
     if token:
         headers["Authorization"] = f"Bearer {token}"
 
     return headers
 
-def get_live_github_data(username, token=None):
+def user_api_url(username):
+    return f"https://api.github.com/users/{username}"
+
+
+def _fetch_user(username, headers, timeout):
+    user_url = user_api_url(username)
+    user_resp = http_client.conditional_get(user_url, headers=headers, timeout=timeout)
+    if user_resp.status_code != 200:
+        return None
+    return user_resp.json()
+
+
+def _fetch_repo_page(url, headers, timeout):
+    resp = http_client.conditional_get(url, headers=headers, timeout=timeout)
+    if resp.status_code != 200:
+        return resp, []
+    return resp, resp.json()
+
+
+def iter_rest_repo_pages(username, headers=None, timeout=None, per_page=100, sort=None):
+    """
+    Yields every page of /users/{username}/repos as a list of repo dicts.
+
+    The first response's `Link: rel="last"` header tells us the page count, so
+    the remaining pages are fetched concurrently with at most
+    GITHUB_PAGE_CONCURRENCY requests in flight. Pages are still yielded in
+    order and the window keeps memory bounded. Consumers can stop iterating
+    at any point; outstanding requests are cancelled.
+    """
+    headers = headers if headers is not None else get_github_headers()
+    timeout = timeout if timeout is not None else call_timeout()
+    base_url = repos_api_url(username, per_page, sort)
+
+    first_resp, first_page = _fetch_repo_page(base_url, headers, timeout)
+    if not first_page:
+        return
+    yield first_page
+
+    last_page = last_page_number(first_resp)
+    if not last_page:
+        return
+
+    window = page_window()
+    pending = deque()
+    next_page = 2
+    try:
+        while next_page <= last_page or pending:
+            while next_page <= last_page and len(pending) < window:
+                url = f"{base_url}&page={next_page}"
+                pending.append(_PAGE_POOL.submit(_fetch_repo_page, url, headers, timeout))
+                next_page += 1
+            _, page = pending.popleft().result()
+            if not page:
+                return
+            yield page
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def repos_api_url(username, per_page=100, sort=None):
+    url = f"https://api.github.com/users/{username}/repos?per_page={per_page}&type=owner"
+    if sort:
+        url += f"&sort={sort}"
+    return url
+
+
+def last_page_number(resp):
+    """Reads the page count from a response's `Link: rel="last"` header, or None."""
+    last_url = (resp.links or {}).get("last", {}).get("url")
+    if not last_url:
+        return None
+    try:
+        return int(parse_qs(urlparse(last_url).query)["page"][0])
+    except (KeyError, ValueError, IndexError):
+        return None
+
+
+def page_window():
+    return max(1, int(os.getenv("GITHUB_PAGE_CONCURRENCY", "4")))
+
+
+def _repo_stars(repo):
+    return repo.get("stargazers_count", repo.get("stargazerCount")) or 0
+
+
+def _repo_language(repo):
+    if "primaryLanguage" in repo:
+        return (repo.get("primaryLanguage") or {}).get("name")
+    return repo.get("language")
+
+
+def aggregate_repos(pages, fields=None, max_repos=None, page_languages=None):
+    """
+    Folds repository pages (REST or GraphQL shaped) into star and language
+    totals as each page arrives, keeping only the counters.
+
+    Languages are primary-language repo counts unless `page_languages` is
+    given, in which case it maps each page to {language: bytes} and the
+    totals are byte-weighted.
+
+    Stops pulling pages once the requested `fields` no longer need more repos,
+    or after `max_repos` (GITHUB_MAX_REPOS, 0 = unlimited).
+    """
+    fields = ALL_FIELDS if fields is None else fields
+    max_repos = max_repos_setting() if max_repos is None else max_repos
+
+    stats = new_repo_stats()
+    if not fields & REPO_FIELDS:
+        return stats
+
+    for page in pages:
+        page = limit_repo_page(stats, page, max_repos)
+        sizes = None
+        if page_languages is not None:
+            sizes = page_languages(page) if "languages" in fields else {}
+        fold_repo_page(stats, page, sizes)
+
+        if max_repos and stats["repo_count"] >= max_repos:
+            break
+    return stats
+
+
+def max_repos_setting():
+    return int(os.getenv("GITHUB_MAX_REPOS", "0"))
+
+
+def new_repo_stats():
+    return {"total_stars": 0, "languages": {}, "repo_count": 0}
+
+
+def limit_repo_page(stats, page, max_repos):
+    """Trims a page so the running total never passes `max_repos` (0 = unlimited)."""
+    if max_repos:
+        return page[:max(0, max_repos - stats["repo_count"])]
+    return page
+
+
+def fold_repo_page(stats, page, language_sizes=None):
+    """
+    Adds one page to the running totals. Languages are primary-language repo
+    counts, or byte totals when `language_sizes` ({language: bytes}) is given.
+    """
+    languages = stats["languages"]
+    for repo in page:
+        stats["total_stars"] += _repo_stars(repo)
+        if language_sizes is None:
+            lang = _repo_language(repo)
+            if lang:
+                languages[lang] = languages.get(lang, 0) + 1
+    stats["repo_count"] += len(page)
+
+    for lang, size in (language_sizes or {}).items():
+        languages[lang] = languages.get(lang, 0) + size
+
+
+def top_languages(languages, limit=5):
+    return sorted(languages.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+
+def _fetch_repo_stats(username, headers, timeout, fields=None):
+    return aggregate_repos(iter_rest_repo_pages(username, headers, timeout), fields=fields)
+
+
+def contrib_api_url(username):
+    return f"https://github-contributions-api.jogruber.de/v4/{username}"
+
+
+def _fetch_contrib_calendar(username, timeout):
+    """Returns (total contributions, daily calendar) from the contributions API."""
+    contrib_url = contrib_api_url(username)
+    contrib_resp = http_client.get(contrib_url, timeout=timeout)
+    if contrib_resp.status_code == 200:
+        c_data = contrib_resp.json()
+        return parse_contrib_total(c_data), parse_contrib_days(c_data)
+    # If the response isn't 200, it stays as 0
+    return 0, []
+
+
+def parse_contrib_total(c_data):
+    if 'total' in c_data and isinstance(c_data['total'], dict):
+        # Sum all year totals into a single integer
+        return sum(c_data['total'].values())
+    return 0
+
+
+# Days kept from the contributions API: the same window as GitHub's calendar.
+CALENDAR_DAYS = 371
+
+
+def parse_contrib_days(c_data, today=None):
+    """
+    Daily {"date", "count"} entries from a contributions-API payload, oldest
+    first, limited to the last CALENDAR_DAYS days (the payload covers every
+    year since the account was created, future days of this year included).
+    """
+    today = utc_today() if today is None else today
+    first = (today - timedelta(days=CALENDAR_DAYS - 1)).isoformat()
+    last = (today + timedelta(days=1)).isoformat()
+    days = [
+        {"date": day["date"], "count": day.get("count") or 0}
+        for day in c_data.get("contributions") or []
+        if isinstance(day, dict) and isinstance(day.get("date"), str) and first <= day["date"] <= last
+    ]
+    days.sort(key=lambda day: day["date"])
+    return days
+
+
+def _result_or(future, deadline, default, label):
+    """Waits for a fan-out call until `deadline`; a timeout or error yields `default` instead of failing the card."""
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        print(f"{label} timed out")
+    except Exception as ex:
+        print(f"{label} Error: {ex}")
+    return default
+
+
+def remember_github_data(username, fields, data):
+    with _LAST_GOOD_LOCK:
+        _LAST_GOOD[username] = (fields, data)
+        _LAST_GOOD.move_to_end(username)
+        while len(_LAST_GOOD) > _LAST_GOOD_SIZE:
+            _LAST_GOOD.popitem(last=False)
+
+
+def get_cached_github_data(username, fields=None):
+    """Returns the last successfully fetched data covering `fields`, or None."""
+    fields = ALL_FIELDS if fields is None else fields
+    with _LAST_GOOD_LOCK:
+        entry = _LAST_GOOD.get(username)
+    if entry is None or not fields <= entry[0]:
+        return None
+    return dict(entry[1])
+
+
+def admission_check(username, token, fields):
+    """
+    Returns (cached_data, graphql_allowed). cached_data is set when both
+    budgets are nearly exhausted and we still have good data to serve.
+    """
+    pool = token_pool.get_pool()
+    # GraphQL needs a token, so without one only the REST budget matters.
+    graphql_exhausted = pool.is_nearly_exhausted("graphql", token) if (token or pool.tokens) else True
+
+    if graphql_exhausted and pool.is_nearly_exhausted("core", token):
+        cached = get_cached_github_data(username, fields)
+        if cached is not None:
+            print(f"Rate limit nearly exhausted; serving cached data for {username}")
+            return cached, False
+    return None, not graphql_exhausted
+
+
+def get_live_github_data(username, token=None, fields=None):
     """
     Fetches real data from GitHub API. 
     Notes: 
     - Unauthenticated requests are rate-limited (60/hr).
-    - For a real production app, we need a token or use GraphQL.
+    - With a token, everything comes from one consolidated GraphQL query;
+      the REST fan-out below is only the fallback.
+    - Every repository page is walked for stars/languages; pass `fields`
+      (subset of ALL_FIELDS) to skip the walk when a card doesn't need it.
+    - Admission control: when the token pool (or the explicit token) is nearly
+      out of both GraphQL and REST budget, the last good data is served
+      instead of spending the remaining requests.
     - For this MVP, we scrape or use public endpoints where possible to avoid token complexity for the user usage.
     """
+    fields = ALL_FIELDS if fields is None else frozenset(fields)
+    cached, graphql_allowed = admission_check(username, token, fields)
+    if cached is not None:
+        return cached
+
+    data = None
+    if graphql_allowed:
+        try:
+            graphql_token = token or token_pool.get_pool().acquire("graphql")
+            graphql_data = fetch_profile_graphql(username, graphql_token, fields)
+            if graphql_data:
+                data = parse_profile_graphql(username, graphql_data, graphql_token, fields)
+        except Exception as e:
+            print(f"GraphQL profile Error: {e}")  # Fall through to REST
+
+    if data is None:
+        data = _get_rest_github_data(username, token, fields)
+
+    if data is not None:
+        remember_github_data(username, fields, data)
+    return data
+
+
+def _get_rest_github_data(username, token=None, fields=None):
+    """
+    REST fallback: the user, repos and contributions calls are independent,
+    so they run concurrently and the fetch costs about as much as the slowest
+    one. No GraphQL call is made here: the fallback only runs after the
+    GraphQL profile query failed or wasn't allowed, and the contributions
+    API already provides the daily calendar.
+    """
     try:
-        # User details
-        user_url = f"https://api.github.com/users/{username}"
         headers = get_github_headers(token)
-        user_resp = requests.get(user_url, headers=headers)
-
-        if user_resp.status_code != 200:
-            return None
-        user_data = user_resp.json()
-        
-        # Repos for stars count (limited to first 100 public repos for basic sum without pagination for MVP speed)
-        repos_url = f"https://api.github.com/users/{username}/repos?per_page=100&type=owner"
-        repos_resp = requests.get(repos_url, headers=headers)
-        repos_data = repos_resp.json() if repos_resp.status_code == 200 else []
-        
-        total_stars = sum(repo.get("stargazers_count", 0) for repo in repos_data)
-        
-        # Languages (Approximation from top repos)
-        languages = {}
-        for repo in repos_data[:10]: # Check top 10 repos
-            lang = repo.get("language")
-            if lang:
-                languages[lang] = languages.get(lang, 0) + 1
-        
-        top_langs = sorted(languages.items(), key=lambda x: x[1], reverse=True)[:5]
-        
+        timeout = call_timeout()
+        # All calls start together, so they share one deadline rather than stacking timeouts.
+        deadline = time.monotonic() + timeout
 
-        # Ensure total_commits is always an integer
-        total_commits = 0 
+        user_future = _FETCH_POOL.submit(_fetch_user, username, headers, timeout)
+        repos_future = _FETCH_POOL.submit(_fetch_repo_stats, username, headers, timeout, fields)
+        contrib_future = _FETCH_POOL.submit(_fetch_contrib_calendar, username, timeout)
 
-        try:
-            contrib_url = f"https://github-contributions-api.jogruber.de/v4/{username}"
-            contrib_resp = requests.get(contrib_url)
-            if contrib_resp.status_code == 200:
-                c_data = contrib_resp.json()
-                if 'total' in c_data and isinstance(c_data['total'], dict):
-                    # Sum all year totals into a single integer
-                    total_commits = sum(c_data['total'].values())
-            # If the response isn't 200, it stays as 0
-        except Exception as ex:
-            print(f"Contrib API Error: {ex}")
-            total_commits = 0 # Safety fallback
-
-        data = {
-            "username": username,
-            "total_stars": total_stars,
-            "total_commits": total_commits,
-            "public_repos": user_data.get("public_repos", 0),
-            "followers": user_data.get("followers", 0),
-            "top_languages": top_langs,
-        }
+        # User details
+        user_data = _result_or(user_future, deadline, None, "User API")
+        if user_data is None:
+            return None
 
-        # --- Optional GraphQL enrichment ---
-        graphql_data = fetch_github_graphql(username, token)
-        if graphql_data:
-            try:
-                contributions, gql_total_commits, contribution_weeks = parse_graphql_contributions(graphql_data)
-                data["contributions"] = contributions
-                data["total_commits"] = gql_total_commits
-                data["contribution_weeks"] = contribution_weeks
-            except Exception:
-                pass  # Never break REST fallback
+        # Walking every repo page can outlast a single call, so it gets its own budget.
+        repos_deadline = time.monotonic() + float(os.getenv("GITHUB_REPOS_TIMEOUT", "30"))
+        repo_stats = _result_or(repos_future, repos_deadline, aggregate_repos([]), "Repos API")
 
-        if "contributions" not in data:
-            # Fallback to empty list; UI should handle missing contribution data gracefully.
-            data["contributions"] = []
+        # Ensure total_commits is always an integer (0 is the safety fallback)
+        total_commits, contributions = _result_or(contrib_future, deadline, (0, []), "Contrib API")
 
-        return data
+        return build_rest_profile_data(username, user_data, repo_stats, total_commits, contributions=contributions)
 
             
     except Exception as e:
         print(f"Error: {e}")
         return None
 
+
+def build_rest_profile_data(username, user_data, repo_stats, total_commits, graphql_data=None, contributions=None):
+    data = {
+        "username": username,
+        "total_stars": repo_stats["total_stars"],
+        "total_commits": total_commits,
+        "public_repos": user_data.get("public_repos", 0),
+        "followers": user_data.get("followers", 0),
+        "top_languages": top_languages(repo_stats["languages"]),
+    }
+
+    # --- Optional GraphQL enrichment ---
+    if graphql_data:
+        try:
+            contributions, gql_total_commits, contribution_weeks = parse_graphql_contributions(graphql_data)
+            data["contributions"] = contributions
+            data["total_commits"] = gql_total_commits
+            data["contribution_weeks"] = contribution_weeks
+        except Exception:
+            pass  # Never break REST fallback
+
+    if "contributions" not in data:
+        # Without a token the daily calendar comes from the contributions API;
+        # an empty list if that failed too (the UI handles missing data).
+        data["contributions"] = contributions or []
+
+    data["streak_data"] = compute_streak(data["contributions"])
+    return data
+
 def get_mock_data(username):
     """Returns dummy data for layout testing/building without hitting API limits"""
-    return {
+    data = {
         "username": username,
         "total_stars": 120,
         "total_commits": 450,
@@ -197,3 +760,5 @@ def get_mock_data(username):
         ]
 
     }
+    data["streak_data"] = compute_streak(data["contributions"])
+    return data
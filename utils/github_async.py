@@ -0,0 +1,389 @@
+"""
+Asyncio-native GitHub fetch layer for the FastAPI handlers.
+
+Mirrors utils.github_api.get_live_github_data -- same output schema and the
+same GraphQL-first / REST-fallback flow, repository pagination, ETag
+revalidation, token pool and language cache -- on one shared
+httpx.AsyncClient, so a slow upstream call suspends a coroutine instead of
+blocking the event loop and every other request on the worker.
+
+Connection pool, retry and timeout settings follow the same environment
+variables as utils/http_client.py.
+"""
+
+import asyncio
+import os
+import random
+
+import httpx
+
+from utils import etag_store, github_api, token_pool
+from utils.http_client import CachedResponse
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_client = None
+_client_loop = None
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+async def _record_rate_limit(resp):
+    if "X-RateLimit-Remaining" in resp.headers:
+        token = token_pool.token_from_authorization(resp.request.headers.get("Authorization"))
+        token_pool.get_pool().record_headers(token, resp.headers)
+
+
+def _build_client():
+    maxsize = _env_int("GITHUB_POOL_MAXSIZE", 20)
+    limits = httpx.Limits(
+        max_connections=maxsize * _env_int("GITHUB_POOL_CONNECTIONS", 10),
+        max_keepalive_connections=maxsize,
+        keepalive_expiry=30,
+    )
+    # Transport-level retries cover connection failures; status retries are in _request.
+    transport = httpx.AsyncHTTPTransport(limits=limits, retries=_env_int("GITHUB_MAX_RETRIES", 3))
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=github_api.call_timeout(),
+        event_hooks={"response": [_record_rate_limit]},
+    )
+
+
+async def _close_client(client, loop):
+    """Closes a client left behind by another event loop, on that loop while it still runs."""
+    try:
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            await client.aclose()
+    except Exception as e:
+        print(f"Async client close Error: {e}")
+
+
+async def get_async_client():
+    """Returns the shared AsyncClient for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        stale, stale_loop = _client, _client_loop
+        _client = _build_client()
+        _client_loop = loop
+        if stale is not None:
+            await _close_client(stale, stale_loop)
+    return _client
+
+
+async def aclose_async_client():
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+async def _request(method, url, **kwargs):
+    """
+    Sends a request, retrying 429/5xx with exponential backoff like the sync
+    session. Waits (Retry-After included) are capped at one call timeout, and
+    a retry that would start after that much time has passed is not made: the
+    last response is returned instead.
+    """
+    retries = _env_int("GITHUB_MAX_RETRIES", 3)
+    try:
+        backoff = float(os.getenv("GITHUB_RETRY_BACKOFF", "0.3"))
+    except ValueError:
+        backoff = 0.3
+    max_wait = github_api.call_timeout()
+
+    client = await get_async_client()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait
+    resource = "graphql" if url == github_api.GITHUB_GRAPHQL_URL else "core"
+    for attempt in range(retries + 1):
+        token_pool.count_request(resource)
+        resp = await client.request(method, url, **kwargs)
+        if resp.status_code not in RETRY_STATUSES or attempt == retries:
+            return resp
+        retry_after = resp.headers.get("Retry-After")
+        delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff * (2 ** attempt)
+        delay = min(delay, max_wait) + random.uniform(0, backoff)
+        if loop.time() + delay > deadline:
+            return resp
+        await asyncio.sleep(delay)
+    return resp
+
+
+async def conditional_get(url, headers=None, timeout=None):
+    """
+    Async twin of http_client.conditional_get: revalidates with stored ETags,
+    reuses bodies on 304. The SQLite store is synchronous, so its calls run
+    in a thread instead of on the event loop. Without `timeout` the client's
+    default (one call timeout) applies.
+    """
+    store = etag_store.get_store()
+    request_headers = dict(headers or {})
+    key = cached = None
+    if store is not None:
+        key = etag_store.validator_key(url, headers)
+        cached = await asyncio.to_thread(store.get, key)
+        if cached:
+            if cached["etag"]:
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    # An explicit timeout=None would disable httpx's timeout altogether.
+    timeout_kwargs = {} if timeout is None else {"timeout": timeout}
+    resp = await _request("GET", url, headers=request_headers, **timeout_kwargs)
+
+    if store is None:
+        return resp
+    if resp.status_code == 304 and cached:
+        await asyncio.to_thread(store.touch, key)
+        return CachedResponse(cached["body"], link=cached["link"], headers=resp.headers)
+    if resp.status_code == 200:
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            await asyncio.to_thread(store.set, key, etag, last_modified, resp.headers.get("Link"), resp.content)
+    return resp
+
+
+async def _graphql_post(query, variables, token, root="user"):
+    resp = await _request(
+        "POST",
+        github_api.GITHUB_GRAPHQL_URL,
+        json={"query": query, "variables": variables},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    if resp.status_code != 200:
+        return None
+
+    graphql_json = resp.json()
+    token_pool.get_pool().record_graphql(token, (graphql_json.get("data") or {}).get("rateLimit"))
+    if graphql_json.get("errors") or not (graphql_json.get("data") or {}).get(root):
+        return None
+    return graphql_json
+
+
+async def fetch_profile_graphql(username, token, fields):
+    if not token:
+        return None
+    repo_count = 100 if fields & github_api.REPO_FIELDS else 0
+    return await _graphql_post(github_api.PROFILE_QUERY, {"login": username, "repoCount": repo_count}, token)
+
+
+async def iter_graphql_repo_pages(username, token, first_connection):
+    connection = first_connection
+    while True:
+        yield connection.get("nodes") or []
+
+        page_info = connection.get("pageInfo") or {}
+        if not page_info.get("hasNextPage"):
+            return
+        graphql_json = await _graphql_post(
+            github_api.REPOS_PAGE_QUERY, {"login": username, "cursor": page_info.get("endCursor")}, token
+        )
+        if not graphql_json:
+            return
+        connection = graphql_json["data"]["user"]["repositories"]
+
+
+async def fetch_repo_languages(repos, token):
+    """Refreshes stale per-repo language sizes (batches run concurrently) and returns byte totals."""
+
+    async def fetch_batch(batch):
+        graphql_json = await _graphql_post(github_api.REPO_LANGUAGES_QUERY, {"ids": batch}, token, root="nodes")
+        if not graphql_json:
+            print(f"Repo languages batch failed ({len(batch)} repos)")
+            return
+        github_api.store_repo_languages(graphql_json["data"]["nodes"])
+
+    await asyncio.gather(*(fetch_batch(batch) for batch in github_api.stale_language_batches(repos)))
+    return github_api.cached_language_totals(repos)
+
+
+async def _fetch_repo_page(url, headers, timeout):
+    resp = await conditional_get(url, headers=headers, timeout=timeout)
+    if resp.status_code != 200:
+        return resp, []
+    return resp, resp.json()
+
+
+async def iter_rest_repo_pages(username, headers, timeout, per_page=100):
+    """Async twin of github_api.iter_rest_repo_pages: ordered pages, bounded look-ahead window."""
+    base_url = github_api.repos_api_url(username, per_page)
+    first_resp, first_page = await _fetch_repo_page(base_url, headers, timeout)
+    if not first_page:
+        return
+    yield first_page
+
+    last_page = github_api.last_page_number(first_resp)
+    if not last_page:
+        return
+
+    window = github_api.page_window()
+    pending = []
+    next_page = 2
+    try:
+        while next_page <= last_page or pending:
+            while next_page <= last_page and len(pending) < window:
+                url = f"{base_url}&page={next_page}"
+                pending.append(asyncio.ensure_future(_fetch_repo_page(url, headers, timeout)))
+                next_page += 1
+            _, page = await pending.pop(0)
+            if not page:
+                return
+            yield page
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def aggregate_repos(pages, fields, page_languages=None):
+    """Async twin of github_api.aggregate_repos over an async page iterator."""
+    max_repos = github_api.max_repos_setting()
+    stats = github_api.new_repo_stats()
+    if not fields & github_api.REPO_FIELDS:
+        return stats
+
+    async for page in pages:
+        page = github_api.limit_repo_page(stats, page, max_repos)
+        sizes = None
+        if page_languages is not None:
+            sizes = await page_languages(page) if "languages" in fields else {}
+        github_api.fold_repo_page(stats, page, sizes)
+
+        if max_repos and stats["repo_count"] >= max_repos:
+            break
+    return stats
+
+
+async def _get_graphql_github_data(username, token, fields):
+    graphql_json = await fetch_profile_graphql(username, token, fields)
+    if not graphql_json:
+        return None
+    repositories = graphql_json["data"]["user"]["repositories"]
+    repo_stats = await aggregate_repos(
+        iter_graphql_repo_pages(username, token, repositories),
+        fields,
+        page_languages=lambda page: fetch_repo_languages(page, token),
+    )
+    return github_api.build_graphql_profile_data(username, graphql_json, repo_stats)
+
+
+async def _with_timeout(coro, timeout, default, label):
+    try:
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        print(f"{label} timed out")
+    except Exception as ex:
+        print(f"{label} Error: {ex}")
+    return default
+
+
+async def _fetch_user(username, headers, timeout):
+    resp = await conditional_get(github_api.user_api_url(username), headers=headers, timeout=timeout)
+    if resp.status_code != 200:
+        return None
+    return resp.json()
+
+
+async def _fetch_contrib_calendar(username, timeout):
+    resp = await _request("GET", github_api.contrib_api_url(username), timeout=timeout)
+    if resp.status_code == 200:
+        c_data = resp.json()
+        return github_api.parse_contrib_total(c_data), github_api.parse_contrib_days(c_data)
+    return 0, []
+
+
+async def _get_rest_github_data(username, token, fields):
+    """
+    REST fallback: the three calls run concurrently, each with its own
+    timeout. Like the sync fallback it makes no GraphQL call.
+    """
+    headers = github_api.get_github_headers(token)
+    timeout = github_api.call_timeout()
+    repos_timeout = float(os.getenv("GITHUB_REPOS_TIMEOUT", "30"))
+
+    user_data, repo_stats, (total_commits, contributions) = await asyncio.gather(
+        _with_timeout(_fetch_user(username, headers, timeout), timeout, None, "User API"),
+        _with_timeout(
+            aggregate_repos(iter_rest_repo_pages(username, headers, timeout), fields),
+            repos_timeout, github_api.new_repo_stats(), "Repos API",
+        ),
+        _with_timeout(_fetch_contrib_calendar(username, timeout), timeout, (0, []), "Contrib API"),
+    )
+    if user_data is None:
+        return None
+    return github_api.build_rest_profile_data(
+        username, user_data, repo_stats, total_commits, contributions=contributions
+    )
+
+
+def graphql_timeout():
+    """Overall deadline (seconds) for the GraphQL path, pagination included, before falling back to REST."""
+    try:
+        return float(os.getenv("GITHUB_GRAPHQL_TIMEOUT", os.getenv("GITHUB_REPOS_TIMEOUT", "30")))
+    except ValueError:
+        return 30.0
+
+
+async def get_live_github_data_async(username, token=None, fields=None):
+    """
+    Awaitable equivalent of github_api.get_live_github_data with the same
+    output schema, admission control and fallbacks. Returns None on failure.
+    """
+    fields = github_api.ALL_FIELDS if fields is None else frozenset(fields)
+    cached, graphql_allowed = github_api.admission_check(username, token, fields)
+    if cached is not None:
+        return cached
+
+    data = None
+    try:
+        if graphql_allowed:
+            graphql_token = token or token_pool.get_pool().acquire("graphql")
+            data = await asyncio.wait_for(
+                _get_graphql_github_data(username, graphql_token, fields), graphql_timeout()
+            )
+    except asyncio.TimeoutError:
+        print("GraphQL profile timed out")  # Fall through to REST
+    except Exception as e:
+        print(f"GraphQL profile Error: {e}")  # Fall through to REST
+
+    if data is None:
+        try:
+            data = await _get_rest_github_data(username, token, fields)
+        except Exception as e:
+            print(f"Error: {e}")
+            data = None
+
+    if data is not None:
+        github_api.remember_github_data(username, fields, data)
+    return data
+
+
+async def fetch_recent_events(username, token=None):
+    """
+    Fetches /users/{username}/events for the recent activity card.
+    Returns (events, error_message); exactly one of them is None.
+    """
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+
+    url = f"https://api.github.com/users/{username}/events"
+    try:
+        resp = await conditional_get(url, headers=headers, timeout=8)
+    except Exception as e:
+        return None, f"Error fetching events: {e}"
+
+    if resp.status_code != 200:
+        return None, f"GitHub API error: {resp.status_code}"
+    return resp.json(), None
@@ -2,10 +2,11 @@
 GitHub API utilities for fetching profile data
 """
 
-import requests
 from typing import Dict, List, Optional
 from collections import Counter
 
+from utils import github_api, http_client
+
 GITHUB_API_BASE = "https://api.github.com"
 
 
@@ -21,7 +22,7 @@ def fetch_github_stats(username: str) -> Optional[Dict]:
     """
     try:
         # Fetch user profile
-        user_response = requests.get(
+        user_response = http_client.conditional_get(
             f"{GITHUB_API_BASE}/users/{username}",
             headers={"Accept": "application/vnd.github.v3+json"}
         )
@@ -32,34 +33,26 @@ def fetch_github_stats(username: str) -> Optional[Dict]:
         
         user_data = user_response.json()
         
-        # Fetch user's repositories
-        repos_response = requests.get(
-            f"{GITHUB_API_BASE}/users/{username}/repos",
-            params={
-                "per_page": 100,
-                "sort": "updated"
-            },
-            headers={"Accept": "application/vnd.github.v3+json"}
+        # Walk every page of the user's repositories, most recently updated first
+        repo_pages = github_api.iter_rest_repo_pages(
+            username,
+            headers={"Accept": "application/vnd.github.v3+json"},
+            sort="updated"
         )
         
-        if repos_response.status_code != 200:
-            print(f"Failed to fetch repos: {repos_response.status_code}")
-            repos = []
-        else:
-            repos = repos_response.json()
-        
-        # Calculate language statistics
+        # Calculate language statistics page by page; only the counters are kept
         language_counts = Counter()
         total_commits_estimate = 0
         
-        for repo in repos[:30]:  # Limit to 30 most recent repos
-            if repo.get('language'):
-                language_counts[repo['language']] += 1
-            
-            # Estimate commits (this is approximate)
-            # For better accuracy, would need to query each repo's commit endpoint
-            if not repo.get('fork'):  # Don't count forked repos
-                total_commits_estimate += repo.get('size', 0) // 10  # Rough estimate
+        for page in repo_pages:
+            for repo in page:
+                if repo.get('language'):
+                    language_counts[repo['language']] += 1
+                
+                # Estimate commits (this is approximate)
+                # For better accuracy, would need to query each repo's commit endpoint
+                if not repo.get('fork'):  # Don't count forked repos
+                    total_commits_estimate += repo.get('size', 0) // 10  # Rough estimate
         
         # Get top languages
         top_languages = [
@@ -137,7 +130,7 @@ def fetch_github_stats_detailed(username: str, github_token: Optional[str] = Non
     """
     
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.github.com/graphql",
             json={
                 "query": query,
@@ -0,0 +1,178 @@
+"""
+Shared HTTP client for all GitHub calls.
+
+Every fetch path goes through one pooled, keep-alive ``requests.Session`` so
+repeated card renders reuse open TCP/TLS connections to api.github.com instead
+of paying for a new handshake on each request.
+
+Tunable through environment variables:
+- GITHUB_POOL_CONNECTIONS: number of per-host pools to keep (default 10)
+- GITHUB_POOL_MAXSIZE: max open connections per host (default 20)
+- GITHUB_MAX_RETRIES: retries for connection errors / 5xx / 429 (default 3)
+- GITHUB_RETRY_BACKOFF: exponential backoff factor in seconds (default 0.3)
+
+conditional_get() additionally revalidates against the ETag store (see
+utils/etag_store.py) so unchanged REST resources come back as free 304s.
+"""
+
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import parse_header_links
+from urllib3.util.retry import Retry
+
+from utils import etag_store, token_pool
+
+DEFAULT_TIMEOUT = 10
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class CappedRetry(Retry):
+    """
+    Retry that honours Retry-After but never sleeps longer than one call's
+    timeout (GITHUB_CALL_TIMEOUT): a secondary rate limit can ask for minutes,
+    and the fan-out gives up on the call long before that while its pool
+    thread would stay asleep.
+    """
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, _env_float("GITHUB_CALL_TIMEOUT", DEFAULT_TIMEOUT))
+
+
+def _build_retry():
+    # POST is included because GraphQL queries are read-only and safe to replay.
+    return CappedRetry(
+        total=_env_int("GITHUB_MAX_RETRIES", 3),
+        backoff_factor=_env_float("GITHUB_RETRY_BACKOFF", 0.3),
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=_env_int("GITHUB_POOL_CONNECTIONS", 10),
+        pool_maxsize=_env_int("GITHUB_POOL_MAXSIZE", 20),
+        max_retries=_build_retry(),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    session.hooks["response"].append(_record_rate_limit)
+    return session
+
+
+def _record_rate_limit(resp, *args, **kwargs):
+    """Feeds every response's X-RateLimit-* headers into the token pool."""
+    if "X-RateLimit-Remaining" in resp.headers:
+        token = token_pool.token_from_authorization(resp.request.headers.get("Authorization"))
+        token_pool.get_pool().record_headers(token, resp.headers)
+
+
+def get_session():
+    """Returns the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def reset_session():
+    """Closes the shared session so the next call builds a fresh one (e.g. after fork)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+def post(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return get_session().post(url, timeout=timeout, **kwargs)
+
+
+class CachedResponse:
+    """
+    Stand-in for a requests.Response rebuilt from the validator store after a
+    304, exposing the parts our fetchers use.
+    """
+
+    from_cache = True
+
+    def __init__(self, body, link=None, headers=None):
+        self.status_code = 200
+        self.content = body
+        self.headers = headers if headers is not None else {}
+        self.links = {}
+        for link_entry in parse_header_links(link) if link else []:
+            rel = link_entry.get("rel") or link_entry.get("url")
+            self.links[rel] = link_entry
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def conditional_get(url, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    GET with `If-None-Match` / `If-Modified-Since` from the validator store.
+
+    A 304 (free against the REST rate limit) returns a CachedResponse with
+    the stored body; a 200 refreshes the stored validators and body. Any other
+    status is returned untouched.
+    """
+    store = etag_store.get_store()
+    if store is None:
+        return get(url, headers=headers, timeout=timeout, **kwargs)
+
+    key = etag_store.validator_key(url, headers)
+    cached = store.get(key)
+    request_headers = dict(headers or {})
+    if cached:
+        if cached["etag"]:
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    resp = get(url, headers=request_headers, timeout=timeout, **kwargs)
+
+    if resp.status_code == 304 and cached:
+        store.touch(key)
+        return CachedResponse(cached["body"], link=cached["link"], headers=resp.headers)
+
+    if resp.status_code == 200:
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            store.set(key, etag, last_modified, resp.headers.get("Link"), resp.content)
+
+    return resp
@@ -0,0 +1,193 @@
+"""
+Popularity-driven prewarming for the API's profile and render caches.
+
+PopularityTracker keeps an exponentially decaying request count per card
+(username, endpoint, params). Prewarmer periodically takes the top-N cards,
+and for every user whose profile entry is about to go stale, refetches the
+data ahead of time and re-renders those cards, so popular READMEs never hit
+a cold cache.
+
+Settings (environment):
+- PREWARM_TOP_N (50): how many of the most requested cards to keep warm
+- PREWARM_INTERVAL (60s): time between passes
+- PREWARM_LEAD (120s): refresh entries this long before they go stale
+- PREWARM_CONCURRENCY (4): profile refreshes running at once
+- PREWARM_BUDGET_SHARE (0.25): prewarming makes at most this share of the
+  pool's rate limit in requests per hourly window, counted separately for
+  REST and GraphQL; organic traffic does not use up its allowance
+- PREWARM_HALF_LIFE (3600s): half-life of the popularity counters
+"""
+
+import asyncio
+import heapq
+import math
+import os
+import threading
+import time
+
+from utils import github_api, token_pool
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+class PopularityTracker:
+    def __init__(self, half_life=None, max_entries=None):
+        self.half_life = _env_float("PREWARM_HALF_LIFE", 3600) if half_life is None else half_life
+        self.max_entries = int(_env_float("PREWARM_TRACK_MAX", 5000)) if max_entries is None else max_entries
+        self._decay = math.log(2) / self.half_life
+        self._scores = {}  # key -> [score, updated_at, spec]
+        self._lock = threading.Lock()
+
+    def _decayed(self, score, updated_at, now):
+        return score * math.exp(-self._decay * (now - updated_at))
+
+    def record(self, key, spec, now=None):
+        """Counts one request for `key`; `spec` is whatever is needed to re-render it."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._scores.get(key)
+            score = self._decayed(entry[0], entry[1], now) if entry else 0.0
+            self._scores[key] = [score + 1.0, now, spec]
+            if len(self._scores) > self.max_entries:
+                self._prune(now)
+
+    def _prune(self, now):
+        # Drop the least popular quarter rather than one entry per request.
+        drop = max(1, len(self._scores) // 4)
+        coldest = heapq.nsmallest(
+            drop, self._scores.items(), key=lambda item: self._decayed(item[1][0], item[1][1], now)
+        )
+        for key, _ in coldest:
+            del self._scores[key]
+
+    def top(self, n, now=None):
+        """Returns the specs of the n most popular keys, most popular first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            items = list(self._scores.values())
+        best = heapq.nlargest(n, items, key=lambda entry: self._decayed(entry[0], entry[1], now))
+        return [entry[2] for entry in best]
+
+    def __len__(self):
+        return len(self._scores)
+
+
+class PrewarmBudget:
+    """
+    Requests made by prewarm passes, per resource and fixed window, capped at
+    share x the pool's limit. Installed as token_pool.request_meter while a
+    pass fetches, so only prewarm's own requests count.
+    """
+
+    WINDOW = 3600  # GitHub's rate-limit window
+
+    def __init__(self, share):
+        self.share = share
+        self._spent = {}  # resource -> [window_start, requests]
+        self._lock = threading.Lock()
+
+    def _window(self, resource, now):
+        window = self._spent.get(resource)
+        if window is None or now - window[0] >= self.WINDOW:
+            window = self._spent[resource] = [now, 0]
+        return window
+
+    def record(self, resource, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._window(resource, now)[1] += 1
+
+    def spent(self, resource, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._window(resource, now)[1]
+
+    def allows(self, now=None):
+        pool = token_pool.get_pool()
+        return all(
+            self.spent(resource, now) < self.share * pool.total_limit(resource)
+            for resource in ("core", "graphql")
+        )
+
+
+class Prewarmer:
+    def __init__(self, tracker, profile_cache, profile_key, render,
+                 top_n=None, interval=None, lead=None, concurrency=None, budget_share=None):
+        """
+        profile_cache: utils.profile_cache.ProfileCache
+        profile_key: username -> profile cache key
+        render: async (spec, entry) -> None, re-renders one card into the render cache
+        """
+        self.tracker = tracker
+        self.profile_cache = profile_cache
+        self.profile_key = profile_key
+        self.render = render
+        self.top_n = int(_env_float("PREWARM_TOP_N", 50)) if top_n is None else top_n
+        self.interval = _env_float("PREWARM_INTERVAL", 60) if interval is None else interval
+        self.lead = _env_float("PREWARM_LEAD", 120) if lead is None else lead
+        self.concurrency = int(_env_float("PREWARM_CONCURRENCY", 4)) if concurrency is None else concurrency
+        self.budget_share = _env_float("PREWARM_BUDGET_SHARE", 0.25) if budget_share is None else budget_share
+        self.budget = PrewarmBudget(self.budget_share)
+        self.refreshed = 0
+        self.skipped_for_budget = 0
+        self._task = None
+
+    async def _due(self, key, now):
+        entry, _ = await self.profile_cache.lookup(key)
+        return entry is None or now - entry["fetched_at"] >= self.profile_cache.ttl - self.lead
+
+    async def run_once(self):
+        """One pass: refresh the due profiles behind the top-N cards and re-render them."""
+        specs_by_user = {}
+        for spec in self.tracker.top(self.top_n):
+            specs_by_user.setdefault(spec["username"], []).append(spec)
+
+        now = time.time()
+        due = [username for username in specs_by_user if await self._due(self.profile_key(username), now)]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def warm(username):
+            async with semaphore:
+                if not self.budget.allows():
+                    self.skipped_for_budget += 1
+                    return
+                # Tasks copy the context, so every request this refresh makes is counted.
+                token_pool.request_meter.set(self.budget)
+                key = self.profile_key(username)
+                entry = await self.profile_cache.refresh(key, username, None, github_api.ALL_FIELDS)
+                if entry is None:
+                    return
+                self.refreshed += 1
+                for spec in specs_by_user[username]:
+                    try:
+                        await self.render(spec, entry)
+                    except Exception as e:
+                        print(f"Prewarm render Error: {e}")
+
+        await asyncio.gather(*(warm(username) for username in due))
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Prewarm Error: {e}")
+
+    def start(self):
+        if self._task is None and self.top_n > 0:
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,130 @@
+"""
+Profile-data cache with stale-while-revalidate and stale-if-error.
+
+Entries go through three phases after they are fetched:
+- fresh (age < ttl): served straight from the cache.
+- stale (age < ttl + swr): served immediately while one background refresh
+  brings the entry up to date.
+- expired: the caller waits for a fetch; if that fails, data younger than
+  ttl + stale_if_error is served instead of an error or mock data.
+
+Defaults come from PROFILE_CACHE_TTL (900s), PROFILE_CACHE_SWR (3600s) and
+PROFILE_CACHE_STALE_IF_ERROR (86400s).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+from utils.cache import aget, aset
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def _env_seconds(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+def data_version(data):
+    """Short fingerprint of profile data; changes whenever any card input changes."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def make_entry(data):
+    return {"data": data, "version": data_version(data), "fetched_at": time.time()}
+
+
+class ProfileCache:
+    def __init__(self, backend, fetch, ttl=None, swr=None, stale_if_error=None):
+        """
+        backend: a utils.cache backend
+        fetch: coroutine function (username, token, fields) -> data or None
+        """
+        self.backend = backend
+        self.fetch = fetch
+        self.ttl = _env_seconds("PROFILE_CACHE_TTL", 900) if ttl is None else ttl
+        self.swr = _env_seconds("PROFILE_CACHE_SWR", 3600) if swr is None else swr
+        self.stale_if_error = (
+            _env_seconds("PROFILE_CACHE_STALE_IF_ERROR", 86400) if stale_if_error is None else stale_if_error
+        )
+        self._refreshing = set()
+        self._background = set()
+
+    @staticmethod
+    def key(username, scope, fields):
+        return f"profile:{username}:{scope}:{','.join(sorted(fields))}"
+
+    async def lookup(self, key):
+        """Returns (entry, state) without fetching; entry is None on a miss."""
+        entry = await aget(self.backend, key)
+        if entry is None:
+            return None, MISS
+        age = time.time() - entry["fetched_at"]
+        if age < self.ttl:
+            return entry, FRESH
+        if age < self.ttl + self.swr:
+            return entry, STALE
+        return entry, MISS
+
+    async def store(self, key, data):
+        entry = make_entry(data)
+        # Keep the entry around long enough to serve it stale or on errors.
+        await aset(self.backend, key, entry, ttl=self.ttl + max(self.swr, self.stale_if_error))
+        return entry
+
+    async def get(self, key, username, token, fields):
+        """
+        Returns (entry, state). An entry is {"data", "version", "fetched_at"};
+        it is None only if nothing usable exists.
+        """
+        entry, state = await self.lookup(key)
+        if state == FRESH:
+            return entry, FRESH
+        if state == STALE:
+            self._schedule_refresh(key, username, token, fields)
+            return entry, STALE
+
+        fetched = await self._fetch_and_store(key, username, token, fields)
+        if fetched is not None:
+            return fetched, MISS
+        if entry is not None and time.time() - entry["fetched_at"] < self.ttl + self.stale_if_error:
+            return entry, STALE
+        return None, MISS
+
+    async def refresh(self, key, username, token, fields):
+        """Fetches and stores the entry now, regardless of its age; returns it or None."""
+        return await self._fetch_and_store(key, username, token, fields)
+
+    async def _fetch_and_store(self, key, username, token, fields):
+        try:
+            data = await self.fetch(username, token, fields)
+        except Exception as e:
+            print(f"Profile fetch Error: {e}")
+            data = None
+        if data is None:
+            return None
+        return await self.store(key, data)
+
+    def _schedule_refresh(self, key, username, token, fields):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                await self._fetch_and_store(key, username, token, fields)
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.ensure_future(refresh())
+        # Hold a reference so the task isn't garbage collected mid-flight.
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
@@ -0,0 +1,141 @@
+"""
+SVG -> PNG rasterization in a bounded process pool.
+
+cairosvg is CPU-bound and holds the GIL, so it runs in worker processes
+(RASTER_WORKERS, default min(4, CPUs)) and at most RASTER_MAX_PENDING
+conversions (default 2 per worker) are in flight at once; the event loop only
+awaits the result. A request arriving when all slots are taken is not queued:
+rasterize() raises RasterBusy so the API can answer 503 right away. PNGs are
+cached in-process by SVG hash and scale, bounded by PNG_CACHE_MAX_BYTES
+(default 32 MiB).
+
+cairosvg stays an optional import, as in app.py, and is only ever imported in
+the workers: the API process just checks that the package is installed.
+Without it (or the cairo libraries) rasterize() raises RasterUnavailable.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.cache import MemoryCache
+from utils.workers import mp_context
+
+MIN_SCALE = 0.25
+MAX_SCALE = 4.0
+
+
+class RasterUnavailable(Exception):
+    pass
+
+
+class RasterBusy(Exception):
+    pass
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _svg_to_png(svg_bytes, scale):
+    """Runs in a worker process."""
+    import cairosvg  # Local import to avoid startup crash if cairo libs are missing.
+    return cairosvg.svg2png(bytestring=svg_bytes, scale=scale)
+
+
+def clamp_scale(scale):
+    return min(MAX_SCALE, max(MIN_SCALE, float(scale)))
+
+
+_available = None
+
+
+def available():
+    global _available
+    if _available is None:
+        # find_spec doesn't import the package; missing cairo libraries show up
+        # in the worker instead (see rasterize).
+        _available = importlib.util.find_spec("cairosvg") is not None
+    return _available
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = None
+_png_cache = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=_env_int("RASTER_WORKERS", min(4, os.cpu_count() or 1)),
+                    mp_context=mp_context(),
+                )
+    return _pool
+
+
+def _get_slots():
+    global _slots
+    if _slots is None:
+        workers = _env_int("RASTER_WORKERS", min(4, os.cpu_count() or 1))
+        _slots = asyncio.Semaphore(_env_int("RASTER_MAX_PENDING", 2 * workers))
+    return _slots
+
+
+def get_png_cache():
+    global _png_cache
+    if _png_cache is None:
+        _png_cache = MemoryCache(
+            max_entries=float("inf"),
+            max_bytes=_env_int("PNG_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+        )
+    return _png_cache
+
+
+def png_key(svg_content, scale):
+    return f"{hashlib.sha256(svg_content.encode('utf-8')).hexdigest()}:{scale:g}"
+
+
+async def rasterize(svg_content, scale=1.0):
+    """Returns PNG bytes for an SVG, from the cache or the process pool."""
+    global _available
+    scale = clamp_scale(scale)
+    cache = get_png_cache()
+    key = png_key(svg_content, scale)
+    png = cache.get(key)
+    if png is not None:
+        return png
+    if not available():
+        raise RasterUnavailable("PNG output requires cairosvg")
+
+    slots = _get_slots()
+    if slots.locked():
+        raise RasterBusy("All PNG conversion slots are busy; try again shortly")
+    async with slots:
+        loop = asyncio.get_running_loop()
+        try:
+            png = await loop.run_in_executor(_get_pool(), _svg_to_png, svg_content.encode("utf-8"), scale)
+        except (ImportError, OSError) as e:
+            # cairosvg is installed but the cairo libraries it loads are not.
+            _available = False
+            raise RasterUnavailable(f"PNG output requires cairosvg and cairo: {e}")
+    cache.set(key, png)
+    return png
+
+
+def shutdown():
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    _slots = None
@@ -0,0 +1,73 @@
+"""
+Cache for rendered SVG cards.
+
+Keys combine everything that changes a card's output -- endpoint, username,
+theme, custom colors, hide/exclude options, the output settings (SVG
+optimization and its precision) and the version (fingerprint) of the profile
+data it was drawn from -- so a profile refresh or a settings change naturally
+misses and old renders age out.
+
+By default cards live in an in-process LRU bounded by total size in bytes
+(RENDER_CACHE_MAX_BYTES, default 32 MiB). With a shared backend (see
+utils.cache) entries expire after RENDER_CACHE_TTL seconds instead.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from utils.cache import MemoryCache, aget, aset
+
+
+def max_bytes_setting():
+    return int(os.getenv("RENDER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class RenderCache:
+    def __init__(self, backend=None, ttl=None):
+        if ttl is None:
+            ttl = float(os.getenv("RENDER_CACHE_TTL", "86400"))
+        self.ttl = ttl
+        if backend is None:
+            backend = MemoryCache(max_entries=float("inf"), max_bytes=max_bytes_setting())
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint, username, theme, colors, options, version, output=None):
+        params = _canonical({"theme": theme, "colors": colors or {}, "options": options or {}, "output": output})
+        digest = hashlib.sha256(params.encode("utf-8")).hexdigest()[:16]
+        return f"render:{endpoint}:{username}:{version}:{digest}"
+
+    async def get(self, key):
+        svg = await aget(self.backend, key)
+        with self._lock:
+            if svg is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return svg
+
+    async def set(self, key, svg):
+        await aset(self.backend, key, svg, ttl=self.ttl)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        stats = {"backend": type(self.backend).__name__, "hits": self.hits, "misses": self.misses}
+        if isinstance(self.backend, MemoryCache):
+            stats.update(
+                entries=len(self.backend),
+                bytes=self.backend.size,
+                max_bytes=self.backend.max_bytes,
+                evictions=self.backend.evictions,
+            )
+        return stats
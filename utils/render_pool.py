@@ -0,0 +1,121 @@
+"""
+Card drawing for the API, optionally offloaded to a process pool.
+
+svgwrite DOM construction is pure Python, so drawing cards on the event loop
+limits a worker to one core and stalls every other request while a
+contributions grid is built. With RENDER_WORKERS > 0 (default min(4, CPUs))
+the cards in RENDER_POOLED_CARDS (default "contributions") are drawn in worker
+processes; RENDER_WORKERS=0 draws everything inline. Cheap cards stay inline
+anyway: a stats card draws in well under the cost of a pool round trip.
+Workers are started with forkserver (spawn where that is unavailable), so
+they never inherit the server's threads, sockets or event loop.
+
+Workers only receive the profile fields their card reads (CARD_FIELDS), as a
+plain dict, which keeps pickling cheap. With SVG_OPTIMIZE on, the
+utils.svg_optimize pass runs in the worker too, and the bytes it saves are
+counted per card type in optimize_stats.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from generators import contrib_card, lang_card, stats_card, streak_card
+from utils import svg_optimize
+from utils.workers import mp_context
+
+
+def _draw_stats(data, theme, colors, options):
+    return stats_card.draw_stats_card(data, theme, show_options=options, custom_colors=colors)
+
+
+def _draw_languages(data, theme, colors, options):
+    return lang_card.draw_lang_card(data, theme, custom_colors=colors, excluded_languages=options["exclude"])
+
+
+def _draw_contributions(data, theme, colors, options):
+    grid = (options or {}).get("grid", "rects")
+    return contrib_card.draw_contrib_card(data, theme, custom_colors=colors, grid=grid)
+
+
+def _draw_streak(data, theme, colors, options):
+    return streak_card.draw_streak_card(data, theme, custom_colors=colors)
+
+
+# Card drawers by endpoint: (data, theme, custom_colors, options) -> svg
+CARD_DRAWERS = {
+    "stats": _draw_stats,
+    "languages": _draw_languages,
+    "contributions": _draw_contributions,
+    "streak": _draw_streak,
+}
+
+# Profile fields each card (and its themes) reads.
+CARD_FIELDS = {
+    "stats": ("username", "total_stars", "total_commits", "public_repos", "followers"),
+    "languages": ("username", "top_languages"),
+    "contributions": ("username", "total_commits", "contributions", "contribution_weeks"),
+    "streak": ("username", "streak_data"),
+}
+
+
+def compact_data(endpoint, data):
+    return {field: data[field] for field in CARD_FIELDS[endpoint] if field in data}
+
+
+def draw(endpoint, data, theme, colors, options, optimize=False):
+    """Returns (svg, size of the SVG as drawn, in bytes)."""
+    svg_content = CARD_DRAWERS[endpoint](data, theme, colors, options)
+    drawn_size = len(svg_content.encode("utf-8"))
+    if optimize:
+        svg_content = svg_optimize.optimize(svg_content)
+    return svg_content, drawn_size
+
+
+def workers_setting():
+    try:
+        return int(os.getenv("RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+    except ValueError:
+        return 0
+
+
+def pooled_cards():
+    return {card.strip() for card in os.getenv("RENDER_POOLED_CARDS", "contributions").split(",") if card.strip()}
+
+
+_pool = None
+_pool_lock = threading.Lock()
+optimize_stats = svg_optimize.OptimizeStats()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=workers_setting(), mp_context=mp_context())
+    return _pool
+
+
+async def render(endpoint, data, theme, colors, options):
+    """Draws one card, in the process pool for pooled cards when RENDER_WORKERS > 0."""
+    optimize = svg_optimize.enabled()
+    if workers_setting() <= 0 or endpoint not in pooled_cards():
+        svg_content, drawn_size = draw(endpoint, data, theme, colors, options, optimize)
+    else:
+        loop = asyncio.get_running_loop()
+        svg_content, drawn_size = await loop.run_in_executor(
+            _get_pool(), draw, endpoint, compact_data(endpoint, data), theme, colors, options, optimize
+        )
+    if optimize:
+        optimize_stats.record(endpoint, drawn_size, len(svg_content.encode("utf-8")))
+    return svg_content
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
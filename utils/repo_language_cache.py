@@ -0,0 +1,45 @@
+"""
+Per-repository language byte totals, cached by `pushedAt`.
+
+A repo's language breakdown only changes when something is pushed to it, so
+entries stay valid until GitHub reports a different `pushedAt`. Recomputing a
+profile then only re-downloads the languages of repos that actually changed.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+class RepoLanguageCache:
+    """Thread-safe LRU map of repo id -> (pushedAt, {language: bytes})."""
+
+    def __init__(self, max_entries=None):
+        if max_entries is None:
+            max_entries = int(os.getenv("LANGUAGE_CACHE_SIZE", "50000"))
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, repo_id, pushed_at):
+        """Returns the cached sizes, or None if missing or the repo was pushed since."""
+        with self._lock:
+            entry = self._entries.get(repo_id)
+            if entry is None or entry[0] != pushed_at:
+                return None
+            self._entries.move_to_end(repo_id)
+            return entry[1]
+
+    def set(self, repo_id, pushed_at, languages):
+        with self._lock:
+            self._entries[repo_id] = (pushed_at, languages)
+            self._entries.move_to_end(repo_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stale_ids(self, repos):
+        """Returns ids of GraphQL repo nodes whose cached sizes are missing or outdated."""
+        return [repo["id"] for repo in repos if self.get(repo["id"], repo.get("pushedAt")) is None]
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,41 @@
+"""
+In-flight request coalescing for asyncio code.
+
+When several coroutines ask for the same key at the same time, only the
+first one (the leader) runs the work; the others await the leader's task and
+receive the same result or exception. The entry is dropped as soon as the
+task finishes, so this never serves stale results -- it only collapses
+concurrent duplicates, e.g. a README embedding three cards of one user.
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        """
+        Runs `fn()` (a coroutine function) for `key`, or joins the call already
+        in flight. Results are shared, so treat them as read-only.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        # Shield the shared task so one disconnected client can't cancel it for everyone.
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def in_flight(self):
+        return len(self._inflight)
@@ -0,0 +1,105 @@
+"""
+Contribution streaks computed in one pass over the contribution calendar.
+
+StreakCounter folds days in order and keeps just enough state (total,
+longest run, trailing run, last day with contributions) to report the
+current streak, the longest streak and total contributions. Re-appending
+the last date replaces its count, so a duplicated day or today's
+still-growing count doesn't double count.
+
+The counter is not carried across profile refreshes: the calendar is a
+rolling one-year window, and days leaving it can shorten the longest run or
+the total, which only a fresh pass over the window gets right. That pass is
+a few hundred days, well under a millisecond.
+
+Current streak rule: consecutive days with contributions whose last day is
+today or yesterday (today may still be at 0, or missing from the calendar).
+A run that ended before yesterday is no longer current. "Today" is the UTC
+date; calendars are in the user's timezone, so days up to one day past it
+are kept and anything later (placeholder days of the current year) is
+ignored. Days missing between two dates count as days without contributions.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+
+def _parse_day(value):
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def utc_today():
+    return datetime.now(timezone.utc).date()
+
+
+class StreakCounter:
+    def __init__(self):
+        self.total = 0
+        self.longest = 0
+        self.run = 0            # consecutive active days ending on the last day
+        self.last_date = None
+        self.last_active = None  # last date with contributions
+        self.active_run = 0     # the run ending on last_active
+        self._before_last = None
+
+    def _state(self):
+        return self.total, self.longest, self.run, self.last_date, self.last_active, self.active_run
+
+    def append(self, day, count):
+        """
+        Adds one calendar day (oldest first). Re-appending the last date
+        replaces its count instead of adding another day.
+        """
+        current = _parse_day(day)
+        if current is None:
+            return
+        count = count or 0
+        if current == self.last_date:
+            self.total, self.longest, self.run, self.last_date, self.last_active, self.active_run = self._before_last
+        else:
+            self._before_last = self._state()
+        if self.last_date is not None and (current - self.last_date).days > 1:
+            # Skipped days had no contributions.
+            self.run = 0
+        if count > 0:
+            self.run += 1
+            self.last_active = current
+            self.active_run = self.run
+        else:
+            self.run = 0
+        self.total += count
+        self.last_date = current
+        self.longest = max(self.longest, self.run)
+
+    def extend(self, days, until=None):
+        """Adds days given as {"date", "count"} dicts, oldest first, skipping dates after `until`."""
+        for entry in days:
+            day = _parse_day(entry.get("date"))
+            if until is not None and day is not None and day > until:
+                continue
+            self.append(day, entry.get("count", 0))
+        return self
+
+    def current(self, today=None):
+        today = utc_today() if today is None else today
+        if self.last_active is None or (today - self.last_active).days > 1:
+            return 0
+        return self.active_run
+
+    def as_dict(self, today=None):
+        return {
+            "current_streak": self.current(today),
+            "longest_streak": self.longest,
+            "total_contributions": self.total,
+        }
+
+
+def compute_streak(contributions, today=None):
+    """Returns the card's streak_data for a contribution calendar ({"date", "count"} days)."""
+    today = utc_today() if today is None else today
+    counter = StreakCounter().extend(contributions or [], until=today + timedelta(days=1))
+    return counter.as_dict(today)
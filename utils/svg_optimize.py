@@ -0,0 +1,352 @@
+"""
+Optional size optimization of card SVGs before they are cached and served.
+
+Works on the generators' serialized output (double-quoted attributes,
+escaped '>' in values, CSS in CDATA), token by token rather than through a
+DOM:
+- rounds numbers in geometry attributes to SVG_PRECISION decimals (default 2)
+- drops attributes set to their default value (opacity="1", x="0", ...)
+- merges identical <defs> children and all <style> blocks into one
+- shortens ids and rewrites url(#id) / href references
+- strips whitespace between tags and minifies CSS
+
+Settings (environment):
+- SVG_OPTIMIZE (off): set to 1 to optimize rendered API cards
+- SVG_PRECISION (2): decimals kept in coordinates
+
+OptimizeStats counts bytes before and after per card type for /api/cache-stats.
+"""
+
+import os
+import re
+import threading
+
+_TOKEN = re.compile(r"<!\[CDATA\[.*?\]\]>|<[^>]*>|[^<]+", re.S)
+_ATTRIBUTE = re.compile(r'([^\s=]+)="([^"]*)"')
+_NUMBER = re.compile(r"-?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?")
+_URL_REF = re.compile(r"url\(#([^)]+)\)")
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s*([{};:,>])\s*")
+_SPACE = re.compile(r"\s+")
+
+# Attributes holding numbers or number lists, rounded to the precision.
+NUMERIC_ATTRIBUTES = frozenset({
+    "x", "y", "x1", "y1", "x2", "y2", "cx", "cy", "r", "rx", "ry", "fx", "fy",
+    "width", "height", "d", "points", "transform", "viewBox", "dx", "dy",
+    "stroke-width", "opacity", "fill-opacity", "stroke-opacity", "stop-opacity",
+    "font-size", "stdDeviation", "offset", "letter-spacing", "stroke-dasharray",
+    "stroke-dashoffset", "radius", "baseFrequency",
+})
+
+# Values that are the default wherever the attribute is allowed. Inherited
+# properties are only dropped when no ancestor could have set them otherwise.
+DEFAULT_VALUES = {
+    "opacity": "1",
+    "fill-opacity": "1",
+    "stroke-opacity": "1",
+    "stop-opacity": "1",
+    "stroke-width": "1",
+    "font-weight": "normal",
+    "font-style": "normal",
+    "text-anchor": "start",
+    "fill-rule": "nonzero",
+    "baseProfile": "full",
+}
+INHERITED = frozenset({
+    "fill-opacity", "stroke-opacity", "stroke-width", "font-weight", "font-style", "text-anchor", "fill-rule",
+})
+
+# Element-specific defaults; filters and gradients have other region defaults,
+# and a rect's rx/ry fall back to each other, so those stay.
+ELEMENT_DEFAULTS = {
+    "rect": {"x": "0", "y": "0"},
+    "text": {"x": "0", "y": "0"},
+    "use": {"x": "0", "y": "0"},
+    "image": {"x": "0", "y": "0"},
+    "circle": {"cx": "0", "cy": "0"},
+    "ellipse": {"cx": "0", "cy": "0"},
+    "line": {"x1": "0", "y1": "0", "x2": "0", "y2": "0"},
+}
+
+# Namespace declarations only needed when their prefix is used.
+OPTIONAL_NAMESPACES = {"xmlns:ev": "ev:", "xmlns:xlink": "xlink:"}
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def enabled():
+    return os.getenv("SVG_OPTIMIZE", "0").lower() in ("1", "true", "yes", "on")
+
+
+def precision_setting():
+    return max(0, _env_int("SVG_PRECISION", 2))
+
+
+def setting_tag():
+    """The output settings as part of a render key: "raw" or "opt<precision>"."""
+    return f"opt{precision_setting()}" if enabled() else "raw"
+
+
+def _format_number(match, precision):
+    text = match.group(0)
+    if "." not in text and "e" not in text.lower():
+        return text
+    value = round(float(text), precision)
+    formatted = f"{value:.{precision}f}".rstrip("0").rstrip(".") if precision else f"{value:.0f}"
+    return "0" if formatted in ("-0", "") else formatted
+
+
+def _round_numbers(value, precision):
+    return _NUMBER.sub(lambda match: _format_number(match, precision), value)
+
+
+def _minify_css(css):
+    css = _CSS_COMMENT.sub("", css)
+    css = _SPACE.sub(" ", css)
+    return _CSS_SPACE.sub(r"\1", css).replace(";}", "}").strip()
+
+
+def _short_ids():
+    # a, b, ..., z, aa, ab, ...
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    n = 0
+    while True:
+        name, i = "", n
+        while True:
+            name = letters[i % 26] + name
+            i = i // 26 - 1
+            if i < 0:
+                break
+        yield name
+        n += 1
+
+
+class _Tag:
+    __slots__ = ("name", "attribs", "closing", "self_closing")
+
+    def __init__(self, token):
+        self.closing = token.startswith("</")
+        self.self_closing = token.endswith("/>")
+        body = token[2 if self.closing else 1:-2 if self.self_closing else -1]
+        self.name = body.split(None, 1)[0] if body.strip() else ""
+        self.attribs = _ATTRIBUTE.findall(body)
+
+    def serialize(self):
+        if self.closing:
+            return f"</{self.name}>"
+        attributes = "".join(f' {name}="{value}"' for name, value in self.attribs)
+        return f"<{self.name}{attributes}{'/>' if self.self_closing else '>'}"
+
+
+def _parse(svg):
+    """Tokens: _Tag for tags, str for text, ("cdata", text) for CDATA sections."""
+    nodes = []
+    for token in _TOKEN.findall(svg):
+        if token.startswith("<![CDATA["):
+            nodes.append(("cdata", token[9:-3]))
+        elif token.startswith("<?") or token.startswith("<!"):
+            nodes.append(token)
+        elif token.startswith("<"):
+            nodes.append(_Tag(token))
+        else:
+            nodes.append(token)
+    return nodes
+
+
+def _element_end(nodes, start):
+    """Index just past the element opened at nodes[start]."""
+    if nodes[start].self_closing:
+        return start + 1
+    depth = 0
+    for i in range(start, len(nodes)):
+        node = nodes[i]
+        if isinstance(node, _Tag):
+            if node.closing:
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            elif not node.self_closing:
+                depth += 1
+    return len(nodes)
+
+
+def _serialize(nodes):
+    out = []
+    for node in nodes:
+        if isinstance(node, _Tag):
+            out.append(node.serialize())
+        elif isinstance(node, tuple):
+            out.append(f"<![CDATA[{node[1]}]]>")
+        else:
+            out.append(node)
+    return "".join(out)
+
+
+def _merge_defs(nodes, renames):
+    """Drops duplicate <defs> children and joins <style> blocks; fills `renames`."""
+    result, i = [], 0
+    while i < len(nodes):
+        node = nodes[i]
+        result.append(node)
+        i += 1
+        if not (isinstance(node, _Tag) and node.name == "defs" and not node.closing and not node.self_closing):
+            continue
+        seen, css, style_at = {}, [], None
+        while i < len(nodes) and not (isinstance(nodes[i], _Tag) and nodes[i].closing and nodes[i].name == "defs"):
+            child = nodes[i]
+            if not isinstance(child, _Tag):
+                if not (isinstance(child, str) and not child.strip()):
+                    result.append(child)
+                i += 1
+                continue
+            end = _element_end(nodes, i)
+            content = nodes[i + 1:end - 1]
+            if (child.name == "style" and [name for name, _ in child.attribs] == ["type"]
+                    and all(isinstance(item, tuple) for item in content)):
+                css.extend(item[1] for item in content)
+                if style_at is None:
+                    style_at = len(result)
+                    result.append(child)
+                i = end
+                continue
+            element_id = dict(child.attribs).get("id")
+            if element_id is None:
+                result.extend(nodes[i:end])
+            else:
+                # Same element apart from its id: keep the first, point references at it.
+                attribs = child.attribs
+                child.attribs = [(name, value) for name, value in attribs if name != "id"]
+                signature = _serialize(nodes[i:end])
+                child.attribs = attribs
+                if signature in seen:
+                    renames[element_id] = seen[signature]
+                else:
+                    seen[signature] = element_id
+                    result.extend(nodes[i:end])
+            i = end
+        if style_at is not None:
+            style = result[style_at]
+            text = _minify_css("".join(css))
+            if text:
+                style.self_closing = False
+                result[style_at + 1:style_at + 1] = [("cdata", text), _Tag("</style>")]
+            else:
+                style.self_closing = True
+    return result
+
+
+def optimize(svg, precision=None):
+    """Returns a smaller SVG that renders the same as `svg`."""
+    precision = precision_setting() if precision is None else precision
+    renames = {}
+    nodes = _merge_defs(_parse(svg), renames)
+
+    # Ids referenced from CSS keep their names.
+    css = " ".join(node[1] for node in nodes if isinstance(node, tuple))
+    ids = [value for node in nodes if isinstance(node, _Tag) for name, value in node.attribs if name == "id"]
+    short = _short_ids()
+    for element_id in ids:
+        if f"#{element_id}" in css or element_id in renames:
+            continue
+        name = next(short)
+        while name in ids:
+            name = next(short)
+        if len(name) < len(element_id):
+            # Ids that are already short keep their name, so optimizing twice changes nothing.
+            renames[element_id] = name
+    # Chains from merged duplicates: dup -> kept -> short
+    for element_id, target in list(renames.items()):
+        while target in renames and renames[target] != target:
+            target = renames[target]
+        renames[element_id] = target
+
+    def rename_ref(match):
+        return f"url(#{renames.get(match.group(1), match.group(1))})"
+
+    text_depth = 0
+    inherited = []  # per open element: properties it may pass down ("*": unknown, via class/style)
+    out_nodes = []
+    for node in nodes:
+        if isinstance(node, _Tag):
+            if node.name in ("text", "tspan", "textPath"):
+                if node.closing:
+                    text_depth -= 1
+                elif not node.self_closing:
+                    text_depth += 1
+            if node.closing:
+                if inherited:
+                    inherited.pop()
+            else:
+                defaults = ELEMENT_DEFAULTS.get(node.name, {})
+                attribs = []
+                for name, value in node.attribs:
+                    if name in NUMERIC_ATTRIBUTES:
+                        value = _round_numbers(value, precision)
+                        if name in ("d", "points", "transform"):
+                            value = _SPACE.sub(" ", value).strip()
+                    if defaults.get(name) == value:
+                        continue
+                    if DEFAULT_VALUES.get(name) == value and not (
+                        name in INHERITED and any(name in props or "*" in props for props in inherited)
+                    ):
+                        continue
+                    if name == "id":
+                        value = renames.get(value, value)
+                    elif name in ("href", "xlink:href") and value.startswith("#"):
+                        value = "#" + renames.get(value[1:], value[1:])
+                    elif "url(#" in value:
+                        value = _URL_REF.sub(rename_ref, value)
+                    attribs.append((name, value))
+                node.attribs = attribs
+                if not node.self_closing:
+                    props = {name for name, _ in attribs}
+                    inherited.append(props | {"*"} if props & {"class", "style"} else props)
+            out_nodes.append(node)
+        elif isinstance(node, str) and not node.strip() and text_depth == 0:
+            continue
+        else:
+            out_nodes.append(node)
+
+    # Unused namespace declarations on the root element.
+    root = out_nodes[0] if out_nodes else None
+    if isinstance(root, _Tag) and root.name == "svg":
+        body = _serialize(out_nodes[1:])
+        root.attribs = [
+            (name, value) for name, value in root.attribs
+            if name not in OPTIONAL_NAMESPACES or OPTIONAL_NAMESPACES[name] in body
+        ]
+        return root.serialize() + body
+    return _serialize(out_nodes)
+
+
+class OptimizeStats:
+    """Bytes before and after optimization, per card type."""
+
+    def __init__(self):
+        self._totals = {}  # card -> [cards, bytes_in, bytes_out]
+        self._lock = threading.Lock()
+
+    def record(self, card, bytes_in, bytes_out):
+        with self._lock:
+            totals = self._totals.setdefault(card, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += bytes_in
+            totals[2] += bytes_out
+
+    def stats(self):
+        with self._lock:
+            return {
+                card: {
+                    "cards": cards,
+                    "bytes_in": bytes_in,
+                    "bytes_out": bytes_out,
+                    "bytes_saved": bytes_in - bytes_out,
+                    "avg_bytes_saved": (bytes_in - bytes_out) // cards if cards else 0,
+                }
+                for card, (cards, bytes_in, bytes_out) in self._totals.items()
+            }
@@ -0,0 +1,175 @@
+"""
+Rate-limit-aware pool of GitHub tokens.
+
+Tokens come from GITHUB_TOKENS (comma separated) plus GITHUB_TOKEN. Every
+response that goes through the shared HTTP session reports its
+X-RateLimit-Remaining / X-RateLimit-Reset headers here, and GraphQL queries
+report their `rateLimit { cost remaining resetAt }`, so each token's budget
+is tracked per resource ("core" for REST, "graphql"). acquire() hands out
+the token with the most budget left; is_nearly_exhausted() lets callers
+serve cached data instead of spending the last few requests.
+
+GITHUB_RATELIMIT_RESERVE is the share of each budget held back (default 0.02).
+"""
+
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+
+# Documented hourly budgets, assumed until GitHub tells us otherwise.
+DEFAULT_LIMITS = {"core": 5000, "graphql": 5000}
+ANONYMOUS_LIMIT = 60
+
+
+def _load_tokens():
+    tokens = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()]
+    single = os.getenv("GITHUB_TOKEN")
+    if single and single not in tokens:
+        tokens.append(single)
+    return tokens
+
+
+def token_from_authorization(value):
+    """Extracts the raw token from a 'Bearer x' / 'token x' Authorization header."""
+    if not value:
+        return None
+    parts = value.split(None, 1)
+    return parts[1] if len(parts) == 2 else parts[0]
+
+
+def token_scope(token):
+    """Stable, non-reversible label for a credential, for use in cache keys."""
+    if not token:
+        return "pool"
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def _parse_reset(value):
+    """GraphQL reports resetAt as ISO-8601; REST as epoch seconds."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class TokenPool:
+    def __init__(self, tokens=None, reserve=None):
+        self.tokens = list(tokens) if tokens is not None else _load_tokens()
+        if reserve is None:
+            reserve = float(os.getenv("GITHUB_RATELIMIT_RESERVE", "0.02"))
+        self.reserve = reserve
+        # (token or None, resource) -> {"remaining", "limit", "reset" (epoch seconds)}
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def _limit_for(self, token, resource):
+        with self._lock:
+            state = self._state.get((token, resource))
+        if state and state.get("limit"):
+            return state["limit"]
+        if token is None:
+            return ANONYMOUS_LIMIT
+        return DEFAULT_LIMITS.get(resource, DEFAULT_LIMITS["core"])
+
+    def remaining(self, token, resource="core", now=None):
+        """Best known remaining budget; a window that has reset counts as full."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state.get((token, resource))
+        if state is None or (state["reset"] is not None and state["reset"] <= now):
+            return self._limit_for(token, resource)
+        return state["remaining"]
+
+    def record(self, token, remaining, reset, resource="core", limit=None):
+        if remaining is None:
+            return
+        with self._lock:
+            previous = self._state.get((token, resource)) or {}
+            self._state[(token, resource)] = {
+                "remaining": int(remaining),
+                "limit": int(limit) if limit else previous.get("limit"),
+                "reset": _parse_reset(reset),
+            }
+
+    def record_headers(self, token, headers):
+        """Updates a token's budget from X-RateLimit-* response headers."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        resource = headers.get("X-RateLimit-Resource", "core")
+        self.record(token, remaining, headers.get("X-RateLimit-Reset"), resource,
+                    limit=headers.get("X-RateLimit-Limit"))
+
+    def record_graphql(self, token, rate_limit):
+        """Updates a token's GraphQL budget from a `rateLimit { cost remaining resetAt }` block."""
+        if rate_limit:
+            self.record(token, rate_limit.get("remaining"), rate_limit.get("resetAt"), "graphql",
+                        limit=rate_limit.get("limit"))
+
+    def acquire(self, resource="core"):
+        """Returns the healthiest token for `resource`, or None if the pool is empty."""
+        if not self.tokens:
+            return None
+        now = time.time()
+        return max(self.tokens, key=lambda token: self.remaining(token, resource, now))
+
+    def is_nearly_exhausted(self, resource="core", token=None):
+        """
+        True when no usable credential has more than its reserve share left.
+        With an explicit `token`, only that token's budget is considered.
+        """
+        if token is not None:
+            candidates = [token]
+        else:
+            candidates = self.tokens or [None]
+        now = time.time()
+        return all(
+            self.remaining(t, resource, now) <= self._limit_for(t, resource) * self.reserve
+            for t in candidates
+        )
+
+    def total_limit(self, resource="core"):
+        """The pool's combined budget for `resource` per rate-limit window."""
+        return sum(self._limit_for(t, resource) for t in (self.tokens or [None]))
+
+    def snapshot(self):
+        """Per-token budgets for diagnostics, with tokens shortened to a suffix."""
+        now = time.time()
+        return {
+            (f"...{t[-4:]}" if t else "anonymous"): {
+                resource: self.remaining(t, resource, now) for resource in DEFAULT_LIMITS
+            }
+            for t in (self.tokens or [None])
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Set by background jobs (see utils.prewarm) to count the requests they make
+# against their own budget: an object with record(resource).
+request_meter = contextvars.ContextVar("request_meter", default=None)
+
+
+def count_request(resource):
+    meter = request_meter.get()
+    if meter is not None:
+        meter.record(resource)
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TokenPool()
+    return _pool
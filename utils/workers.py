@@ -0,0 +1,15 @@
+"""
+Process-pool settings shared by the card renderer and the rasterizer.
+"""
+
+import multiprocessing
+
+
+def mp_context():
+    """
+    Start method for worker processes: forkserver, or spawn where that is
+    unavailable, so workers never inherit the server's threads, sockets or
+    event loop.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")